@@ -0,0 +1,42 @@
+from itertools import chain
+from typing import List, Optional, Sequence
+
+# Ixcham format: 1-bayt sarlavha, keyin javoblar.
+# Har javob (javob + 1) sifatida saqlanadi, shuning uchun -1 (javobsiz) -> 0.
+FORMAT_BYTES = 1          # har javob 1 bayt (0..254)
+FORMAT_NIBBLES = 2        # har javob 4 bit (0..14), juft sonli
+FORMAT_NIBBLES_ODD = 3    # har javob 4 bit, oxirgi bayt yarmi bo'sh
+
+# Bayt -> (yuqori, quyi) yarim bayt javoblari
+_NIBBLE_PAIRS = [((byte >> 4) - 1, (byte & 0x0F) - 1) for byte in range(256)]
+
+def pack_answers(answers: Sequence[int]) -> Optional[bytes]:
+    """
+    Javoblarni ixcham baytlarga o'girish
+
+    Barcha javoblar 0..14 (yoki -1) bo'lsa - javob boshiga yarim bayt,
+    0..254 bo'lsa - bir bayt. Sig'masa None (JSON da qoladi).
+    """
+    values = [answer + 1 for answer in answers]
+    if values and (min(values) < 0 or max(values) > 255):
+        return None
+    if not values or max(values) > 15:
+        return bytes([FORMAT_BYTES]) + bytes(values)
+
+    odd = len(values) % 2
+    if odd:
+        values.append(0)
+    packed = bytes((high << 4) | low for high, low in zip(values[::2], values[1::2]))
+    return bytes([FORMAT_NIBBLES_ODD if odd else FORMAT_NIBBLES]) + packed
+
+def unpack_answers(data: bytes) -> List[int]:
+    """pack_answers() ning teskarisi"""
+    fmt, body = data[0], data[1:]
+    if fmt == FORMAT_BYTES:
+        return [value - 1 for value in body]
+    if fmt not in (FORMAT_NIBBLES, FORMAT_NIBBLES_ODD):
+        raise ValueError(f"Noma'lum javoblar formati: {fmt}")
+    answers = list(chain.from_iterable(map(_NIBBLE_PAIRS.__getitem__, body)))
+    if fmt == FORMAT_NIBBLES_ODD:
+        answers.pop()
+    return answers
@@ -0,0 +1,237 @@
+import hashlib
+import heapq
+import operator
+import random
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy.orm import Session
+from app.invalidation import invalidation_bus
+from app.models.test import Test, TestQuestion
+from app.schemas.test import TestDeliveryResponse
+
+# Statistikada mavjud bo'lmagan variant tanlovi - javobsiz deb hisoblanadi
+UNANSWERED = -1
+
+class AnswerKey:
+    """
+    Test javoblar kaliti
+
+    To'g'ri javob indekslari ixcham array('i') da saqlanadi - Integer
+    ustun bilan bir xil diapazon (savollar TestQuestion.order bo'yicha
+    tartiblangan). O'quvchiga beriladigan (javobsiz) test payload i ham
+    shu yerda bir marta quriladi.
+    Savollar to'plamli testlarda (draw_count) og'irlikli tanlov -
+    Efraimidis-Spirakis, O(n log draw_count), og'irliklar nisbatiga bog'liq emas.
+    fingerprint - kalit mazmuni hash i (version dan farqli, process lar
+    orasida bir xil).
+    """
+    __slots__ = (
+        "test_id", "version", "fingerprint", "question_ids", "correct",
+        "passing_score", "time_limit", "is_published", "delivery",
+        "draw_count", "weights", "option_counts",
+    )
+
+    def __init__(
+        self,
+        test_id: int,
+        version: int,
+        question_ids: array,
+        correct: array,
+        passing_score: int,
+        time_limit: int,
+        is_published: bool,
+        delivery: TestDeliveryResponse,
+        draw_count: Optional[int] = None,
+        weights: Optional[Sequence[float]] = None,
+    ):
+        self.test_id = test_id
+        self.version = version
+        self.question_ids = question_ids
+        self.correct = correct
+        self.passing_score = passing_score
+        self.time_limit = time_limit
+        self.is_published = is_published
+        self.delivery = delivery
+        self.option_counts = array("i", (len(question.options) for question in delivery.questions))
+        self.draw_count = draw_count if draw_count and draw_count < len(correct) else None
+        digest = hashlib.blake2b(question_ids.tobytes() + correct.tobytes(), digest_size=8)
+        digest.update(str(self.draw_count).encode())
+        self.fingerprint = digest.hexdigest()
+        self.weights = None
+        if self.draw_count and weights and len(set(weights)) > 1:
+            self.weights = array("d", weights)
+
+    @property
+    def total_questions(self) -> int:
+        """Bitta urinishdagi savollar soni"""
+        return self.draw_count or len(self.correct)
+
+    @property
+    def is_pool(self) -> bool:
+        return self.draw_count is not None
+
+    def draw_positions(self, rng: random.Random) -> List[int]:
+        """
+        Urinish uchun savollar (kalitdagi pozitsiyalar, ko'rsatish tartibida)
+
+        Oddiy testda - barcha savollar aralashtirilgan, to'plamli testda -
+        draw_count ta savol (og'irlik bo'yicha, takrorlanmasdan).
+        """
+        total = len(self.correct)
+        if not self.is_pool:
+            positions = list(range(total))
+            rng.shuffle(positions)
+            return positions
+        if self.weights is None:
+            return rng.sample(range(total), self.draw_count)
+        # Efraimidis-Spirakis: kalit u^(1/w), eng kattalari olinadi. Rad etish
+        # usulidan farqli, bitta og'ir savol tanlovni sekinlashtirmaydi
+        weights = self.weights
+        return heapq.nlargest(
+            self.draw_count, range(total), key=lambda i: rng.random() ** (1.0 / weights[i])
+        )
+
+    def stat_answers(self, answers: List[int], positions: Optional[Sequence[int]] = None) -> List[int]:
+        """
+        Statistika uchun javoblar: variantlar oralig'idan tashqaridagi indeks -> UNANSWERED
+
+        Client yuborgan ixtiyoriy son statistika qatorlarini cheksiz
+        ko'paytirmasligi uchun (to'g'ri javob indeksi o'zgarishsiz qoladi).
+        """
+        if positions is None:
+            positions = range(len(answers))
+        option_counts, correct = self.option_counts, self.correct
+        return [
+            answer if 0 <= answer < option_counts[position] or answer == correct[position] else UNANSWERED
+            for answer, position in zip(answers, positions)
+        ]
+
+    def grade(self, answers: List[int], positions: Optional[Sequence[int]] = None) -> Tuple[int, int, bool]:
+        """
+        Javoblarni baholash: (score, percentage, passed)
+
+        positions berilsa answers[i] - kalitdagi positions[i] savolning javobi.
+        """
+        correct = self.correct if positions is None else array("i", map(self.correct.__getitem__, positions))
+        score = sum(map(operator.eq, answers, correct))
+        total_questions = len(correct)
+        percentage = int((score / total_questions) * 100) if total_questions > 0 else 0
+        return score, percentage, percentage >= self.passing_score
+
+class AnswerKeyCache:
+    """
+    Test id bo'yicha versiyalangan javoblar kaliti keshi (LRU)
+
+    Test tahrirlansa yoki o'chirilsa `invalidate()` chaqiriladi: versiya
+    oshiriladi, shuning uchun invalidatsiyadan oldin boshlangan yuklash
+    eskirgan kalitni keshga yoza olmaydi.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._keys: "OrderedDict[int, AnswerKey]" = OrderedDict()
+        self._versions: Dict[int, int] = {}
+
+    def get(self, db: Session, test_id: int) -> Optional[AnswerKey]:
+        """Kalitni keshdan olish, bo'lmasa bitta so'rov bilan yuklash"""
+        with self._lock:
+            key = self._keys.get(test_id)
+            if key is not None:
+                self._keys.move_to_end(test_id)
+                return key
+            version = self._versions.get(test_id, 0)
+
+        key = self._load(db, test_id, version)
+        if key is None:
+            return None
+
+        with self._lock:
+            if self._versions.get(test_id, 0) == version:
+                self._keys[test_id] = key
+                self._keys.move_to_end(test_id)
+                while len(self._keys) > self.max_size:
+                    self._keys.popitem(last=False)
+        return key
+
+    def invalidate(self, test_id: int, broadcast: bool = True) -> None:
+        """Test o'zgarganda kalitni keshdan chiqarish (boshqa process larda ham)"""
+        with self._lock:
+            self._versions[test_id] = self._versions.get(test_id, 0) + 1
+            self._keys.pop(test_id, None)
+        if broadcast:
+            invalidation_bus.publish("answer_key", str(test_id), local=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            for test_id in self._keys:
+                self._versions[test_id] = self._versions.get(test_id, 0) + 1
+            self._keys.clear()
+
+    def get_many(self, db: Session, test_ids: List[int]) -> Dict[int, AnswerKey]:
+        """Bir nechta test kalitlari; keshda yo'qlari bitta so'rov bilan yuklanadi"""
+        keys: Dict[int, AnswerKey] = {}
+        versions: Dict[int, int] = {}
+        with self._lock:
+            for test_id in set(test_ids):
+                key = self._keys.get(test_id)
+                if key is not None:
+                    self._keys.move_to_end(test_id)
+                    keys[test_id] = key
+                else:
+                    versions[test_id] = self._versions.get(test_id, 0)
+
+        if versions:
+            loaded = self._load_many(db, versions)
+            with self._lock:
+                for test_id, key in loaded.items():
+                    if self._versions.get(test_id, 0) == key.version:
+                        self._keys[test_id] = key
+                while len(self._keys) > self.max_size:
+                    self._keys.popitem(last=False)
+            keys.update(loaded)
+        return keys
+
+    def _load(self, db: Session, test_id: int, version: int) -> Optional[AnswerKey]:
+        return self._load_many(db, {test_id: version}).get(test_id)
+
+    def _load_many(self, db: Session, versions: Dict[int, int]) -> Dict[int, AnswerKey]:
+        rows = db.query(Test, TestQuestion).outerjoin(
+            TestQuestion, TestQuestion.test_id == Test.id
+        ).filter(Test.id.in_(list(versions))).order_by(Test.id, TestQuestion.order, TestQuestion.id).all()
+
+        grouped: Dict[int, tuple] = {}
+        for test, question in rows:
+            _, questions = grouped.setdefault(test.id, (test, []))
+            if question is not None:
+                questions.append(question)
+
+        keys = {}
+        for test_id, (test, questions) in grouped.items():
+            delivery = TestDeliveryResponse(
+                id=test.id,
+                title=test.title,
+                description=test.description,
+                time_limit=test.time_limit,
+                questions=questions
+            )
+            question_ids = array("i", (question.id for question in questions))
+            correct = array("i", (question.correct_answer for question in questions))
+            keys[test_id] = AnswerKey(
+                test_id, versions[test_id], question_ids, correct, test.passing_score,
+                test.time_limit, test.is_published, delivery,
+                draw_count=test.draw_count,
+                weights=[question.weight for question in questions]
+            )
+        return keys
+
+answer_key_cache = AnswerKeyCache()
+
+@invalidation_bus.subscribe("answer_key")
+def _invalidate_answer_key(test_id: Optional[str]) -> None:
+    if test_id is None:
+        answer_key_cache.clear()
+    else:
+        answer_key_cache.invalidate(int(test_id), broadcast=False)
@@ -0,0 +1,87 @@
+import json
+import secrets
+import time
+from array import array
+from typing import List, Optional, Tuple
+from app.cache import cache_backend
+from app.cache_backends import CacheBackend, MemoryBackend
+
+class TestAttempt:
+    """
+    Server tomonda saqlanadigan test urinishi
+
+    positions - o'quvchiga ko'rsatilgan savollar (javoblar kalitidagi
+    pozitsiyalar) ko'rsatish tartibida. To'plamli testda bu tushgan savollar.
+    key_fingerprint - urinish boshlangandagi javoblar kaliti (process lar
+    orasida bir xil, test o'zgarsa boshqacha bo'ladi).
+    """
+    __slots__ = ("attempt_id", "user_id", "test_id", "key_fingerprint", "started_at", "positions")
+
+    def __init__(
+        self,
+        attempt_id: str,
+        user_id: int,
+        test_id: int,
+        key_fingerprint: str,
+        positions: List[int],
+        started_at: Optional[float] = None
+    ):
+        self.attempt_id = attempt_id
+        self.user_id = user_id
+        self.test_id = test_id
+        self.key_fingerprint = key_fingerprint
+        self.started_at = time.time() if started_at is None else started_at
+        self.positions = array("i", positions)
+
+    def canonical_answers(self, answers: List[int]) -> Tuple[List[int], List[int]]:
+        """
+        Ko'rsatilgan tartibdagi javoblarni kalit tartibiga o'tkazish
+
+        Qaytaradi: (pozitsiyalar o'sish tartibida, ularga mos javoblar).
+        """
+        pairs = sorted(zip(self.positions, answers))
+        return [position for position, _ in pairs], [answer for _, answer in pairs]
+
+    @property
+    def elapsed(self) -> float:
+        return time.time() - self.started_at
+
+    def to_bytes(self) -> bytes:
+        return json.dumps([
+            self.user_id, self.test_id, self.key_fingerprint, self.started_at, self.positions.tolist()
+        ]).encode()
+
+    @classmethod
+    def from_bytes(cls, attempt_id: str, data: bytes) -> "TestAttempt":
+        user_id, test_id, key_fingerprint, started_at, positions = json.loads(data)
+        return cls(attempt_id, user_id, test_id, key_fingerprint, positions, started_at)
+
+class AttemptStore:
+    """
+    TTL bilan test urinishlari ombori
+
+    Har bir urinish test time_limit + grace soniya yashaydi, keyin o'chadi.
+    Umumiy kesh ombori (Redis) bo'lsa urinish boshqa worker ga kelgan
+    submit da ham topiladi.
+    """
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+
+    def create(self, user_id: int, test_id: int, key_fingerprint: str, positions: List[int], ttl_seconds: int) -> TestAttempt:
+        """Yangi urinish yaratish"""
+        attempt = TestAttempt(secrets.token_urlsafe(16), user_id, test_id, key_fingerprint, positions)
+        self.backend.set(f"attempt:{attempt.attempt_id}", attempt.to_bytes(), ttl_seconds)
+        return attempt
+
+    def get(self, attempt_id: str) -> Optional[TestAttempt]:
+        """Urinishni olish; topilmasa yoki muddati o'tgan bo'lsa None"""
+        data = self.backend.get(f"attempt:{attempt_id}")
+        return TestAttempt.from_bytes(attempt_id, data) if data is not None else None
+
+    def discard(self, attempt_id: str) -> None:
+        """Urinishni yopish (natija saqlangandan keyin)"""
+        self.backend.delete(f"attempt:{attempt_id}")
+
+# Process ichidagi ombor bo'lsa - alohida, cheklanmagan (LRU urinishlarni chiqarib yubormasligi uchun)
+attempt_store = AttemptStore(cache_backend if cache_backend.shared else MemoryBackend())
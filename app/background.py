@@ -0,0 +1,62 @@
+import asyncio
+import logging
+from typing import Callable, List
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Ro'yxatdan o'tgan davriy vazifalar: (nom, interval, funksiya)
+_jobs: List[tuple] = []
+_shutdown_jobs: List[Callable[[Session], None]] = []
+_tasks: List[asyncio.Task] = []
+
+def periodic_job(interval_seconds: int, name: str = None, run_on_shutdown: bool = False):
+    """
+    Davriy fon vazifasini ro'yxatdan o'tkazish (decorator)
+
+    Funksiya yangi DB session bilan threadpool da chaqiriladi:
+    `def job(db: Session) -> None`. run_on_shutdown=True bo'lsa
+    server to'xtashida oxirgi marta bajariladi (masalan, buferni yozish).
+    """
+    def decorator(func: Callable[[Session], None]):
+        _jobs.append((name or func.__name__, interval_seconds, func))
+        if run_on_shutdown:
+            _shutdown_jobs.append(func)
+        return func
+    return decorator
+
+def run_job(func: Callable[[Session], None]) -> None:
+    """Vazifani alohida session bilan bir marta bajarish"""
+    db = SessionLocal()
+    try:
+        func(db)
+    finally:
+        db.close()
+
+async def _job_loop(name: str, interval_seconds: int, func: Callable[[Session], None]):
+    while True:
+        try:
+            await run_in_threadpool(run_job, func)
+        except Exception:
+            logger.exception("Fon vazifasi xatolik bilan tugadi: %s", name)
+        await asyncio.sleep(interval_seconds)
+
+def start_background_jobs() -> None:
+    """Barcha davriy vazifalarni ishga tushirish (startup)"""
+    for name, interval_seconds, func in _jobs:
+        _tasks.append(asyncio.create_task(_job_loop(name, interval_seconds, func)))
+
+async def stop_background_jobs() -> None:
+    """Davriy vazifalarni to'xtatish (shutdown)"""
+    for task in _tasks:
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()
+
+    for func in _shutdown_jobs:
+        try:
+            await run_in_threadpool(run_job, func)
+        except Exception:
+            logger.exception("Shutdown vazifasi xatolik bilan tugadi: %s", func.__name__)
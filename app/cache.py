@@ -0,0 +1,213 @@
+import asyncio
+import functools
+import json
+import logging
+import struct
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+from fastapi import Response
+from starlette.concurrency import run_in_threadpool
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.cache_backends import CacheBackend, create_backend
+from app.database import SessionLocal
+from app.invalidation import invalidation_bus
+from app.serialization import dump_json
+
+logger = logging.getLogger(__name__)
+
+# Yozuv: 8 bayt fresh_until (unix vaqt) + JSON baytlar
+_ENTRY_HEADER = struct.Struct(">d")
+
+cache_backend = create_backend(settings.CACHE_URL, settings.CACHE_MAX_ENTRIES, settings.CACHE_KEY_PREFIX)
+
+class CacheEntry:
+    """Keshdagi tayyor javob (serializatsiya qilingan JSON baytlar)"""
+    __slots__ = ("value", "fresh_until")
+
+    def __init__(self, value: bytes, fresh_until: float):
+        self.value = value
+        self.fresh_until = fresh_until
+
+    @property
+    def is_fresh(self) -> bool:
+        return time.time() < self.fresh_until
+
+class ResponseCache:
+    """
+    Teg (tag) lar bilan javoblar keshi (ombor - CacheBackend)
+
+    Kalitga teglarning joriy versiyalari qo'shiladi. `invalidate(tag)`
+    versiyani oshiradi: eski yozuvlar - va invalidatsiyadan oldin
+    boshlangan yuklash natijasi - endi o'qilmaydi va TTL bilan o'chadi.
+    Ombor process ichida bo'lsa, invalidatsiya boshqa process larga
+    xabar qilinadi (invalidation_bus).
+    """
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+
+    def versioned_key(self, key: str, tags: Tuple[str, ...]) -> str:
+        versions = self.backend.get_many([f"tag:{tag}" for tag in tags])
+        return key + "|" + ",".join(version.decode() if version is not None else "0" for version in versions)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Yozuv (yangi yoki stale); stale oynasi ham o'tgan bo'lsa None"""
+        data = self.backend.get(f"response:{key}")
+        if data is None:
+            return None
+        (fresh_until,) = _ENTRY_HEADER.unpack_from(data)
+        return CacheEntry(data[_ENTRY_HEADER.size:], fresh_until)
+
+    def set(self, key: str, value: bytes, ttl: float, stale_ttl: float) -> None:
+        self.backend.set(f"response:{key}", _ENTRY_HEADER.pack(time.time() + ttl) + value, ttl + stale_ttl)
+
+    def invalidate(self, *tags: str) -> None:
+        """Teglarga tegishli barcha yozuvlarni eskirgan deb belgilash"""
+        for tag in tags:
+            self.backend.incr(f"tag:{tag}")
+            if not self.backend.shared:
+                invalidation_bus.publish("cache_tags", tag, local=False)
+
+response_cache = ResponseCache(cache_backend)
+
+@invalidation_bus.subscribe("cache_tags")
+def _invalidate_tags(tag: Optional[str]) -> None:
+    # Boshqa process dagi invalidatsiya (umumiy omborda versiyalar allaqachon umumiy)
+    if response_cache.backend.shared:
+        return
+    if tag is None:
+        response_cache.backend.clear()
+    else:
+        response_cache.backend.incr(f"tag:{tag}")
+
+class SingleFlight:
+    """
+    Bir xil parallel hisoblashlarni birlashtirish (process ichida)
+
+    Kalit bo'yicha birinchi so'rov hisoblashni alohida task da boshlaydi,
+    bir vaqtda kelgan qolgan so'rovlar o'sha natijani (JSON baytlar) kutadi.
+    Task shield qilingan - birinchi so'rov uzilsa ham qolganlari natija oladi.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def running(self, key: str) -> bool:
+        return key in self._tasks
+
+    def start(self, key: str, compute: Callable[[], Awaitable[bytes]]) -> asyncio.Task:
+        """Hisoblashni boshlash (yoki ketayotganini qaytarish)"""
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(compute())
+            self._tasks[key] = task
+            task.add_done_callback(functools.partial(self._finished, key))
+        return task
+
+    async def do(self, key: str, compute: Callable[[], Awaitable[bytes]]) -> bytes:
+        return await asyncio.shield(self.start(key, compute))
+
+    def _finished(self, key: str, task: asyncio.Task) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            task.exception()  # kutuvchilar bo'lmasa ham "never retrieved" ogohlantirishi chiqmasin
+
+flights = SingleFlight()
+
+def _cache_key(func: Callable, kwargs: Dict[str, Any]) -> str:
+    # Faqat oddiy qiymatli parametrlar (query/path) kalitga kiradi; Session va h.k. emas
+    params = {
+        name: value for name, value in kwargs.items()
+        if value is None or isinstance(value, (str, int, float, bool))
+    }
+    return f"{func.__module__}.{func.__name__}:{json.dumps(params, sort_keys=True)}"
+
+async def _render(func: Callable, adapter: TypeAdapter, kwargs: Dict[str, Any]) -> bytes:
+    """
+    Handler ni o'z session i bilan bajarib natijani JSON baytlarga o'girish
+
+    Natija bir nechta so'rovga beriladi va so'rov session lari undan oldin
+    yopilishi mumkin. Oddiy `def` handler (va serializatsiya) threadpool da
+    bajariladi - event loop bloklanmaydi.
+    """
+    db = SessionLocal()
+    try:
+        kwargs = {name: db if isinstance(value, Session) else value for name, value in kwargs.items()}
+        if asyncio.iscoroutinefunction(func):
+            result = await func(**kwargs)
+            return dump_json(adapter, result)
+        return await run_in_threadpool(lambda: dump_json(adapter, func(**kwargs)))
+    finally:
+        db.close()
+
+def _log_refresh_failure(key: str, task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Keshni yangilab bo'lmadi: %s", key, exc_info=task.exception())
+
+def single_flight(response_model: Any):
+    """
+    Bir xil parallel so'rovlarni bitta hisoblashga birlashtirish (decorator)
+
+    Kalit - handler va normallashtirilgan (saralangan) path/query
+    parametrlari. Natija keshlanmaydi - faqat bir vaqtda kelgan so'rovlar
+    bitta natijani bo'lishadi. Foydalanuvchiga bog'liq yoki `Response`
+    header lari yoziladigan handlerlarga qo'llanmaydi.
+    """
+    adapter = response_model if isinstance(response_model, TypeAdapter) else TypeAdapter(response_model)
+
+    def decorator(func: Callable):
+        @functools.wraps(func)
+        async def wrapper(**kwargs):
+            body = await flights.do(_cache_key(func, kwargs), lambda: _render(func, adapter, kwargs))
+            return Response(content=body, media_type="application/json")
+
+        return wrapper
+    return decorator
+
+def cached(response_model: Any, tags: Iterable[str], ttl: Optional[float] = None, stale_ttl: Optional[float] = None):
+    """
+    Route handler javobini keshlash (decorator)
+
+    Javob response_model bo'yicha bir marta JSON baytlarga serializatsiya
+    qilinadi va keyingi so'rovlarga `Response` sifatida beriladi. TTL
+    o'tgandan keyin stale_ttl davomida eski javob darhol qaytariladi va
+    fon rejimida yangilanadi (stale-while-revalidate). Bir vaqtda kelgan
+    miss lar bitta yuklashga birlashadi (SingleFlight). O'zgartiruvchi
+    handlerlar `response_cache.invalidate(tag)` chaqiradi.
+
+        @router.get("/categories", response_model=List[VideoCategoryResponse])
+        @cached(List[VideoCategoryResponse], tags=("categories",))
+        async def get_categories(db: Session = Depends(get_db)): ...
+    """
+    adapter = response_model if isinstance(response_model, TypeAdapter) else TypeAdapter(response_model)
+    tags = tuple(tags)
+    ttl = settings.CACHE_TTL_SECONDS if ttl is None else ttl
+    stale_ttl = settings.CACHE_STALE_SECONDS if stale_ttl is None else stale_ttl
+
+    def decorator(func: Callable):
+        async def load(key: str, kwargs: Dict[str, Any]) -> bytes:
+            body = await _render(func, adapter, kwargs)
+            response_cache.set(key, body, ttl, stale_ttl)
+            return body
+
+        @functools.wraps(func)
+        async def wrapper(**kwargs):
+            # Kalitdagi teg versiyalari yuklashdan oldin olinadi - yuklash paytidagi
+            # invalidatsiyadan keyin natija eski versiya kaliti ostida qoladi
+            key = response_cache.versioned_key(_cache_key(func, kwargs), tags)
+            entry = response_cache.get(key)
+            if entry is not None:
+                if not entry.is_fresh and not flights.running(key):
+                    flights.start(key, lambda: load(key, kwargs)).add_done_callback(
+                        functools.partial(_log_refresh_failure, key)
+                    )
+                return Response(content=entry.value, media_type="application/json")
+
+            # Bir vaqtda kelgan miss lar bitta yuklashni kutadi
+            return Response(content=await flights.do(key, lambda: load(key, kwargs)), media_type="application/json")
+
+        return wrapper
+    return decorator
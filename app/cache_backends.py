@@ -0,0 +1,125 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+class CacheBackend:
+    """
+    Kesh ombori: kalit -> baytlar (TTL bilan) va butun sonli hisoblagichlar
+
+    shared=True - ombor barcha process lar uchun umumiy (Redis), aks holda
+    har bir process o'z nusxasiga ega va invalidatsiya xabarlari kerak.
+    """
+    shared = False
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        return [self.get(key) for key in keys]
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def incr(self, key: str) -> int:
+        """Hisoblagichni oshirish (TTL siz, LRU dan chiqarilmaydi)"""
+        raise NotImplementedError
+
+class MemoryBackend(CacheBackend):
+    """Process ichidagi LRU ombor (max_entries=None - faqat TTL bilan tozalanadi)"""
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[bytes, Optional[float]]]" = OrderedDict()
+        self._counters: Dict[str, int] = {}
+        self._next_purge = 0.0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                counter = self._counters.get(key)
+                return None if counter is None else str(counter).encode()
+            value, expires_at = item
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (value, now + ttl if ttl else None)
+            if now >= self._next_purge:
+                self._purge_expired(now)
+            if self.max_entries is not None:
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _purge_expired(self, now: float) -> None:
+        # Muddati o'tgan yozuvlarni vaqti-vaqti bilan tozalash (o'qilmay qolganlari uchun)
+        self._next_purge = now + 60
+        for key in [key for key, (_, expires_at) in self._entries.items() if expires_at is not None and expires_at < now]:
+            del self._entries[key]
+
+class RedisBackend(CacheBackend):
+    """
+    Redis protokoli orqali umumiy ombor (redis paketi kerak)
+
+    Hisoblagichlar TTL siz saqlanadi - Redis da maxmemory-policy
+    volatile-* bo'lishi kerak, aks holda ular chiqarib yuborilishi mumkin.
+    """
+    shared = True
+
+    def __init__(self, url: str, prefix: str = ""):
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("CACHE_URL Redis ga ko'rsatilgan, lekin 'redis' paketi o'rnatilmagan") from exc
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + key)
+
+    def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        if not keys:
+            return []
+        return self.client.mget([self.prefix + key for key in keys])
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        self.client.set(self.prefix + key, value, px=int(ttl * 1000) if ttl else None)
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+    def incr(self, key: str) -> int:
+        return self.client.incr(self.prefix + key)
+
+def create_backend(url: str, max_entries: Optional[int] = None, prefix: str = "") -> CacheBackend:
+    """CACHE_URL bo'yicha ombor: memory:// yoki redis:// (rediss://, unix://)"""
+    scheme = url.split("://", 1)[0].lower()
+    if scheme == "memory":
+        return MemoryBackend(max_entries)
+    if scheme in ("redis", "rediss", "unix"):
+        return RedisBackend(url, prefix)
+    raise ValueError(f"Noma'lum CACHE_URL sxemasi: {scheme}")
@@ -0,0 +1,223 @@
+import hashlib
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+from app.background import periodic_job
+from app.compression import SUPPORTED_ENCODINGS, compress
+from app.config import settings
+from app.database import SessionLocal
+from app.invalidation import invalidation_bus
+from app.models.subject import Subject, TeacherSubject
+from app.models.teacher import Teacher
+from app.models.test import Test, TestQuestion
+from app.models.video import Video, VideoCategory
+from app.schemas.catalog import CatalogSnapshot, CatalogSubject, CatalogTeacher, CatalogTest, CatalogVideo
+from app.schemas.video import VideoCategoryResponse
+
+logger = logging.getLogger(__name__)
+
+# Katalog snapshot iga kiradigan modellar
+CATALOG_MODELS = (Subject, TeacherSubject, Teacher, Video, VideoCategory, Test, TestQuestion)
+
+class CatalogSnapshotData:
+    """Tayyor snapshot: JSON, oldindan siqilgan variantlari (gzip, br) va kontent hash (ETag)"""
+    __slots__ = ("body", "encoded", "etag", "built_at")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        # Siqish bir marta - qurishda (maksimal daraja), har so'rovda emas
+        self.encoded = {encoding: compress(body, encoding) for encoding in SUPPORTED_ENCODINGS}
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        self.built_at = datetime.now(timezone.utc)
+
+def _project(schema, instance, **nested):
+    """
+    ORM obyektidan schema yaratish; nested maydonlar alohida beriladi
+
+    model_validate() relationship larni (Subject.teachers, Teacher.videos)
+    lazy yuklab yuborgan bo'lardi.
+    """
+    data = {name: getattr(instance, name) for name in schema.model_fields if name not in nested}
+    return schema(**data, **nested)
+
+def build_catalog(db: Session) -> CatalogSnapshot:
+    """Nashr qilingan katalogni yig'ish (bir nechta tekis so'rov, N+1 siz)"""
+    categories = db.query(VideoCategory).order_by(VideoCategory.order, VideoCategory.id).all()
+    subjects = db.query(Subject).filter(Subject.is_active == 1).order_by(Subject.order, Subject.id).all()
+    teachers = {teacher.id: teacher for teacher in db.query(Teacher).all()}
+    assignments = db.query(TeacherSubject.subject_id, TeacherSubject.teacher_id).distinct().all()
+    videos = db.query(Video).filter(Video.is_published == True).order_by(
+        Video.order, Video.created_at.desc(), Video.id
+    ).all()
+    tests = db.query(Test, func.count(TestQuestion.id)).outerjoin(
+        TestQuestion, TestQuestion.test_id == Test.id
+    ).filter(Test.is_published == True).group_by(Test.id).order_by(
+        Test.created_at.desc(), Test.id.desc()
+    ).all()
+
+    tests_by_video = defaultdict(list)
+    loose_tests = []
+    video_ids = {video.id for video in videos}
+    for test, question_count in tests:
+        item = CatalogTest(
+            id=test.id,
+            title=test.title,
+            description=test.description,
+            category=test.category,
+            subject=test.subject,
+            time_limit=test.time_limit,
+            passing_score=test.passing_score,
+            draw_count=test.draw_count,
+            question_count=question_count
+        )
+        if test.video_id in video_ids:
+            tests_by_video[test.video_id].append(item)
+        else:
+            loose_tests.append(item)
+
+    teachers_by_subject = defaultdict(set)
+    for subject_id, teacher_id in assignments:
+        teachers_by_subject[subject_id].add(teacher_id)
+
+    # (subject_id, teacher_id) -> videolar; o'qituvchisi fanga biriktirilmaganlar - fan ostida
+    videos_by_teacher = defaultdict(list)
+    videos_by_subject = defaultdict(list)
+    loose_videos = []
+    for video in videos:
+        item = _project(CatalogVideo, video, tests=tests_by_video.get(video.id, []))
+        if video.subject_id is None:
+            loose_videos.append(item)
+        elif video.teacher_id in teachers_by_subject[video.subject_id]:
+            videos_by_teacher[(video.subject_id, video.teacher_id)].append(item)
+        else:
+            videos_by_subject[video.subject_id].append(item)
+
+    catalog_subjects = []
+    for subject in subjects:
+        subject_teachers = sorted(
+            (teachers[teacher_id] for teacher_id in teachers_by_subject[subject.id] if teacher_id in teachers),
+            key=lambda teacher: (-(teacher.rating or 0.0), teacher.id)
+        )
+        catalog_subjects.append(_project(
+            CatalogSubject, subject,
+            teachers=[
+                _project(CatalogTeacher, teacher, videos=videos_by_teacher.get((subject.id, teacher.id), []))
+                for teacher in subject_teachers
+            ],
+            videos=videos_by_subject.get(subject.id, [])
+        ))
+
+    return CatalogSnapshot(
+        categories=[VideoCategoryResponse.model_validate(category) for category in categories],
+        subjects=catalog_subjects,
+        videos=loose_videos,
+        tests=loose_tests
+    )
+
+class CatalogSnapshotStore:
+    """
+    Oldindan tayyorlangan katalog snapshot i
+
+    Katalog modellari o'zgargan tranzaksiya commit bo'lganda `mark_stale()`
+    chaqiriladi va snapshot fon thread ida qayta quriladi. Ketma-ket
+    o'zgarishlar bitta qayta qurishga birlashadi. Qurish paytida eski
+    snapshot berilib turadi.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot: Optional[CatalogSnapshotData] = None
+        self._generation = 0  # boshlangan qurishlar
+        self._installed = 0  # joriy snapshot qaysi qurishdan
+        self._stale = False
+        self._rebuilding = False
+
+    def get(self, db: Session) -> CatalogSnapshotData:
+        """Joriy snapshot; hali qurilmagan bo'lsa shu yerda quriladi"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self.rebuild(db)
+        return snapshot
+
+    def rebuild(self, db: Session) -> CatalogSnapshotData:
+        """Snapshot ni darhol qayta qurish"""
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+        snapshot = CatalogSnapshotData(build_catalog(db).model_dump_json().encode())
+        with self._lock:
+            # Keyinroq boshlangan qurish allaqachon tugagan bo'lsa, eski natija yozilmaydi
+            if generation > self._installed:
+                self._snapshot, self._installed = snapshot, generation
+            return self._snapshot
+
+    def mark_stale(self) -> None:
+        """Katalog o'zgardi - fon thread ida qayta qurish"""
+        with self._lock:
+            self._stale = True
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+        threading.Thread(target=self._rebuild_loop, name="catalog-snapshot", daemon=True).start()
+
+    def _rebuild_loop(self) -> None:
+        while True:
+            with self._lock:
+                if not self._stale:
+                    self._rebuilding = False
+                    return
+                self._stale = False
+
+            db = SessionLocal()
+            try:
+                self.rebuild(db)
+            except Exception:
+                logger.exception("Katalog snapshot ini qurib bo'lmadi")
+            finally:
+                db.close()
+
+catalog_snapshot = CatalogSnapshotStore()
+
+# ===== O'zgarishlarni aniqlash (SQLAlchemy session event lari) =====
+
+@event.listens_for(SessionLocal, "after_flush")
+def _track_flush(session: Session, flush_context) -> None:
+    if any(isinstance(instance, CATALOG_MODELS) for instance in session.new) \
+            or any(isinstance(instance, CATALOG_MODELS) for instance in session.deleted) \
+            or any(isinstance(instance, CATALOG_MODELS) for instance in session.dirty):
+        session.info["catalog_changed"] = True
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _track_bulk_statement(orm_execute_state) -> None:
+    # session.execute(insert/update/delete(Model)) - flush dan o'tmaydi.
+    # counter_update=True - faqat hisoblagich (masalan views_count), katalogga kirmaydi
+    if orm_execute_state.execution_options.get("counter_update"):
+        return
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and issubclass(mapper.class_, CATALOG_MODELS):
+            orm_execute_state.session.info["catalog_changed"] = True
+
+@event.listens_for(SessionLocal, "after_commit")
+def _rebuild_after_commit(session: Session) -> None:
+    if session.info.pop("catalog_changed", False):
+        catalog_snapshot.mark_stale()
+        invalidation_bus.publish("catalog", local=False)
+
+@invalidation_bus.subscribe("catalog")
+def _rebuild_on_remote_change(payload) -> None:
+    # Boshqa process dagi o'zgarish (yoki kanal qayta ulangan)
+    catalog_snapshot.mark_stale()
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop("catalog_changed", None)
+
+@periodic_job(settings.CATALOG_SNAPSHOT_REFRESH_SECONDS, name="catalog_snapshot")
+def refresh_catalog_snapshot(db: Session) -> None:
+    """Ilovadan tashqaridagi o'zgarishlar uchun snapshot ni davriy qayta qurish"""
+    catalog_snapshot.rebuild(db)
@@ -0,0 +1,50 @@
+import gzip
+from typing import Callable, Dict, Iterable, Optional
+
+try:
+    import brotli
+except ImportError:  # brotli ixtiyoriy - bo'lmasa faqat gzip
+    brotli = None
+
+# Afzallik tartibida: bir xil q qiymatida birinchisi tanlanadi
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+def compress(body: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """body ni berilgan encoding da siqish (level - gzip 1-9, brotli 0-11)"""
+    if encoding == "br":
+        return brotli.compress(body, quality=11 if level is None else level)
+    return gzip.compress(body, compresslevel=9 if level is None else level)
+
+def negotiate_encoding(accept_encoding: Optional[str], available: Iterable[str] = SUPPORTED_ENCODINGS) -> Optional[str]:
+    """
+    Accept-Encoding bo'yicha eng mos encoding (yoki None - siqilmagan)
+
+    q qiymatlari hisobga olinadi (q=0 - taqiqlangan), "*" boshqa barcha
+    encoding larni bildiradi.
+    """
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            weights[name.strip().lower()] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in available:
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+def no_compression(func: Callable) -> Callable:
+    """Route ni CompressionMiddleware dan chiqarish (decorator)"""
+    func.skip_compression = True
+    return func
@@ -0,0 +1,62 @@
+import hashlib
+from typing import Optional
+from fastapi import Depends, HTTPException, Request
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import get_db
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match ni tekshirish (weak taqqoslash: W/ prefiksi e'tiborsiz)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    return any(
+        (tag[2:] if tag.startswith("W/") else tag) == opaque
+        for tag in (tag.strip() for tag in if_none_match.split(","))
+    )
+
+def versioned_by(*models):
+    """
+    Ro'yxat endpoint lari uchun arzon validator (route dependency)
+
+    Qatorlarni yuklashdan oldin bitta so'rov bilan modellar jadvallarining
+    max(updated_at) va count(*) qiymatlari olinadi (updated_at yo'q
+    jadvallarda max(id)). Weak ETag shu versiya va so'rov URL idan
+    hisoblanadi. If-None-Match mos kelsa handler chaqirilmay 304 qaytadi.
+    Aks holda validator lar ConditionalGetMiddleware orqali javobga qo'shiladi.
+
+    Last-Modified yuborilmaydi: o'chirish max(updated_at) ni o'zgartirmaydi,
+    faqat If-Modified-Since yuboradigan client o'chirilgan qatorlarni ko'rib
+    qolaverardi. count(*) esa ETag ga kiradi - o'chirish ETag ni o'zgartiradi.
+
+    Faqat hisoblagichlar (views_count) o'zgarishi updated_at ni o'zgartirmaydi,
+    shuning uchun ETag ham o'zgarmaydi (weak - mazmunan bir xil javob).
+
+        @router.get("/", dependencies=[versioned_by(Video, VideoCategory)])
+    """
+    columns = []
+    for model in models:
+        marker = getattr(model, "updated_at", None)
+        marker = func.max(marker) if marker is not None else func.max(model.id)
+        columns.append(select(marker).scalar_subquery())
+        columns.append(select(func.count()).select_from(model).scalar_subquery())
+    version_query = select(*columns)
+
+    def dependency(request: Request, db: Session = Depends(get_db)) -> None:
+        row = db.execute(version_query).one()
+        # Ulanish pool ga qaytariladi - single-flight da kutayotgan so'rovlar uni band qilib turmasin
+        db.rollback()
+        digest = hashlib.blake2b(digest_size=12)
+        digest.update(f"{settings.API_VERSION}|{request.url.path}?{request.url.query}|".encode())
+        digest.update(repr(tuple(row)).encode())
+        etag = f'W/"{digest.hexdigest()}"'
+
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        request.state.validators = headers
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            raise HTTPException(status_code=304, headers=headers)
+
+    return Depends(dependency)
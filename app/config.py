@@ -28,6 +28,48 @@ class Settings(BaseSettings):
     # CORS
     CORS_ORIGINS: str = Field(default="http://localhost:3000")
 
+    # Fon vazifalari (soniyalarda)
+    RELATED_VIDEOS_REFRESH_SECONDS: int = Field(default=300)
+    TRENDING_REFRESH_SECONDS: int = Field(default=60)
+    QUESTION_STATS_FLUSH_SECONDS: int = Field(default=10)
+    TEACHER_STATS_RECONCILE_SECONDS: int = Field(default=3600)
+    CATALOG_SNAPSHOT_REFRESH_SECONDS: int = Field(default=600)
+
+    # Kesh ombori: memory:// (har bir process o'zida) yoki redis://host:6379/0 (umumiy)
+    CACHE_URL: str = Field(default="memory://")
+    CACHE_KEY_PREFIX: str = Field(default="madinabonu:")
+    # Process lar orasidagi invalidatsiya kanali (Redis pub/sub yoki Postgres NOTIFY)
+    CACHE_INVALIDATION_CHANNEL: str = Field(default="madinabonu_invalidation")
+
+    # Ma'lumotnoma javoblari keshi (kategoriyalar, fanlar): TTL, stale-while-revalidate oynasi va hajm
+    CACHE_TTL_SECONDS: int = Field(default=300)
+    CACHE_STALE_SECONDS: int = Field(default=3600)
+    CACHE_MAX_ENTRIES: int = Field(default=1024)
+
+    # Javoblarni siqish: shundan kichik javoblar siqilmaydi (bayt); gzip (1-9) va brotli (0-11) darajasi
+    COMPRESSION_MINIMUM_SIZE: int = Field(default=1024)
+    COMPRESSION_GZIP_LEVEL: int = Field(default=6)
+    COMPRESSION_BROTLI_QUALITY: int = Field(default=4)
+
+    # Test urinishlari: time_limit dan keyin qo'shimcha vaqt (tarmoq kechikishi uchun)
+    TEST_ATTEMPT_GRACE_SECONDS: int = Field(default=30)
+
+    # Test natijalari javoblarini ixcham (bayt/yarim bayt) formatda saqlash
+    COMPACT_TEST_ANSWERS: bool = Field(default=False)
+
+    # O'qituvchi reytingi: Bayes o'rtachasi uchun oldindan taxmin (prior)
+    TEACHER_RATING_PRIOR_MEAN: float = Field(default=3.0)
+    TEACHER_RATING_PRIOR_WEIGHT: float = Field(default=5.0)
+
+    # Delta sync: cursor oynasi (kech commit bo'lgan tranzaksiyalar uchun) va tombstone saqlash muddati
+    SYNC_OVERLAP_SECONDS: int = Field(default=60)
+    SYNC_TOMBSTONE_RETENTION_DAYS: int = Field(default=30)
+
+    # Trending reyting
+    TRENDING_HALF_LIFE_HOURS: float = Field(default=24.0)
+    TRENDING_WINDOW_HOURS: int = Field(default=24 * 7)
+    TRENDING_TOP_K: int = Field(default=100)
+
     class Config:
         env_file = ".env"
         case_sensitive = True
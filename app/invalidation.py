@@ -0,0 +1,194 @@
+import json
+import logging
+import queue
+import secrets
+import select
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+class RedisTransport:
+    """Invalidatsiya xabarlari Redis pub/sub orqali"""
+
+    def __init__(self, client, channel: str):
+        self._client = client
+        self._channel = channel
+
+    def send(self, messages: List[str]) -> None:
+        pipeline = self._client.pipeline(transaction=False)
+        for message in messages:
+            pipeline.publish(self._channel, message)
+        pipeline.execute()
+
+    def listen(self, on_message: Callable[[str], None], on_connect: Callable[[], None], stopping: threading.Event) -> None:
+        pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        try:
+            pubsub.subscribe(self._channel)
+            on_connect()
+            while not stopping.is_set():
+                message = pubsub.get_message(timeout=1.0)
+                if message is not None:
+                    on_message(message["data"].decode())
+        finally:
+            pubsub.close()
+
+class PostgresTransport:
+    """Invalidatsiya xabarlari Postgres LISTEN/NOTIFY orqali (qo'shimcha servis kerak emas)"""
+
+    def __init__(self, engine: Engine, channel: str):
+        self._engine = engine
+        self._channel = channel
+
+    def send(self, messages: List[str]) -> None:
+        # Bitta tranzaksiya, bitta so'rov - navbatdagi barcha xabarlar
+        with self._engine.begin() as connection:
+            connection.execute(
+                text("SELECT pg_notify(:channel, message) FROM unnest(CAST(:messages AS text[])) AS message"),
+                {"channel": self._channel, "messages": messages}
+            )
+
+    def listen(self, on_message: Callable[[str], None], on_connect: Callable[[], None], stopping: threading.Event) -> None:
+        # Pool dan ajratilgan alohida ulanish - butun umri davomida LISTEN qiladi
+        connection = self._engine.raw_connection()
+        connection.detach()
+        try:
+            dbapi_connection = connection.dbapi_connection
+            dbapi_connection.autocommit = True
+            with dbapi_connection.cursor() as cursor:
+                cursor.execute(f'LISTEN "{self._channel}"')
+            on_connect()
+            while not stopping.is_set():
+                if select.select([dbapi_connection], [], [], 1.0)[0]:
+                    dbapi_connection.poll()
+                    while dbapi_connection.notifies:
+                        on_message(dbapi_connection.notifies.pop(0).payload)
+        finally:
+            connection.close()
+
+class InvalidationBus:
+    """
+    Process lar (uvicorn worker, instance) orasida invalidatsiya xabarlari
+
+    `publish(topic, payload)` shu process dagi handler larni darhol chaqiradi
+    va xabarni boshqa process larga yuborish navbatiga qo'yadi. Navbatni
+    alohida thread bo'shatadi: handler tarmoq/DB ni kutmaydi, bir vaqtda
+    yig'ilgan xabarlar bitta so'rov bilan yuboriladi. Har bir process o'z
+    xabarlarini o'tkazib yuboradi. Ulanish uzilib qayta tiklansa, handler lar
+    payload=None bilan chaqiriladi - o'tkazib yuborilgan xabarlar bo'lishi
+    mumkin, shuning uchun butun kesh tashlanadi.
+    """
+
+    # Bitta yuborishdagi eng ko'p xabar
+    MAX_BATCH = 500
+
+    def __init__(self):
+        self.origin = secrets.token_hex(8)
+        self._handlers: Dict[str, List[Callable[[Optional[str]], None]]] = defaultdict(list)
+        self._transport = None
+        self._thread: Optional[threading.Thread] = None
+        self._sender: Optional[threading.Thread] = None
+        self._outbox: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._stopping = threading.Event()
+
+    def subscribe(self, topic: str):
+        """Handler ni ro'yxatdan o'tkazish (decorator): `def handler(payload: Optional[str])`"""
+        def decorator(func: Callable[[Optional[str]], None]):
+            self._handlers[topic].append(func)
+            return func
+        return decorator
+
+    def publish(self, topic: str, payload: str = "", local: bool = True) -> None:
+        """Xabar yuborish; local=False - faqat boshqa process larga"""
+        if local:
+            self._dispatch(topic, payload)
+        if self._transport is not None:
+            self._outbox.put(json.dumps({"origin": self.origin, "topic": topic, "payload": payload}))
+
+    def start(self, transport) -> None:
+        """Tinglovchi va yuboruvchi thread larni ishga tushirish (startup); transport=None - bitta process"""
+        if transport is None or self._thread is not None:
+            return
+        self._transport = transport
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._listen_loop, name="invalidation-bus", daemon=True)
+        self._thread.start()
+        self._sender = threading.Thread(target=self._send_loop, args=(transport,), name="invalidation-bus-send", daemon=True)
+        self._sender.start()
+
+    def stop(self) -> None:
+        """Navbatni yuborib, tinglashni to'xtatish (shutdown)"""
+        self._transport = None
+        self._stopping.set()
+        if self._sender is not None:
+            self._outbox.put(None)
+            self._sender.join(timeout=5)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._thread = self._sender = None
+
+    def _send_loop(self, transport) -> None:
+        while True:
+            message = self._outbox.get()
+            if message is None:
+                return
+            batch = [message]
+            while len(batch) < self.MAX_BATCH:
+                try:
+                    message = self._outbox.get_nowait()
+                except queue.Empty:
+                    break
+                if message is None:
+                    self._outbox.put(None)
+                    break
+                batch.append(message)
+            try:
+                transport.send(batch)
+            except Exception:
+                logger.exception("Invalidatsiya xabarlarini yuborib bo'lmadi (%d ta)", len(batch))
+
+    def _listen_loop(self) -> None:
+        connected_before = False
+
+        def on_connect():
+            nonlocal connected_before
+            if connected_before:
+                for topic in list(self._handlers):
+                    self._dispatch(topic, None)
+            connected_before = True
+
+        while not self._stopping.is_set():
+            try:
+                self._transport.listen(self._receive, on_connect, self._stopping)
+            except Exception:
+                logger.exception("Invalidatsiya kanali uzildi, qayta ulanish")
+                self._stopping.wait(5)
+
+    def _receive(self, message: str) -> None:
+        try:
+            data = json.loads(message)
+        except ValueError:
+            return
+        if data.get("origin") != self.origin:
+            self._dispatch(data.get("topic"), data.get("payload"))
+
+    def _dispatch(self, topic: str, payload: Optional[str]) -> None:
+        for handler in self._handlers.get(topic, ()):
+            try:
+                handler(payload)
+            except Exception:
+                logger.exception("Invalidatsiya handler i xatolik bilan tugadi: %s", topic)
+
+def create_transport(backend, engine: Engine, channel: str):
+    """Redis keshi bo'lsa - Redis pub/sub, aks holda Postgres NOTIFY; SQLite da - yo'q"""
+    client = getattr(backend, "client", None)
+    if backend.shared and client is not None:
+        return RedisTransport(client, channel)
+    if engine.dialect.name == "postgresql":
+        return PostgresTransport(engine, channel)
+    return None
+
+invalidation_bus = InvalidationBus()
@@ -0,0 +1,164 @@
+import json
+import threading
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.invalidation import invalidation_bus
+from app.models.test import TestResult
+
+# time_spent yo'q natijalar vaqt bo'yicha oxirida turadi
+NO_TIME = 2 ** 31
+
+# Bitta invalidatsiya xabaridagi eng ko'p natija
+RESULTS_PER_MESSAGE = 150
+
+class TestLeaderboard:
+    """
+    Bitta test reytingi (har bir foydalanuvchining eng yaxshi natijasi)
+
+    Kalitlar (-percentage, time_spent, user_id) tartiblangan ro'yxatda
+    saqlanadi: yangilash va foydalanuvchi o'rnini topish - bisect.
+    """
+
+    def __init__(self):
+        self._best: Dict[int, Tuple[int, int, int]] = {}
+        self._ranking: List[Tuple[int, int, int]] = []
+
+    def submit(self, user_id: int, percentage: int, time_spent: Optional[int]) -> None:
+        """Natijani qo'shish (faqat oldingisidan yaxshi bo'lsa)"""
+        key = (-percentage, NO_TIME if time_spent is None else time_spent, user_id)
+        old = self._best.get(user_id)
+        if old is not None:
+            if old <= key:
+                return
+            del self._ranking[bisect_left(self._ranking, old)]
+        self._best[user_id] = key
+        insort(self._ranking, key)
+
+    def rank(self, user_id: int) -> Optional[int]:
+        """Foydalanuvchi o'rni (teng natijalar bir xil o'rinda)"""
+        key = self._best.get(user_id)
+        if key is None:
+            return None
+        return bisect_left(self._ranking, key[:2]) + 1
+
+    def top(self, limit: int) -> List[Tuple[int, int, int, Optional[int]]]:
+        """Eng yaxshi natijalar: (rank, user_id, percentage, time_spent)"""
+        return [
+            (
+                bisect_left(self._ranking, key[:2]) + 1,
+                key[2],
+                -key[0],
+                None if key[1] == NO_TIME else key[1],
+            )
+            for key in self._ranking[:limit]
+        ]
+
+    def __len__(self) -> int:
+        return len(self._ranking)
+
+class LeaderboardRegistry:
+    """
+    Faol testlar reytinglari (LRU)
+
+    Reyting birinchi so'rovda ix_test_results_leaderboard indeksi tartibida
+    o'qib to'ldiriladi, keyin yangi natijalar bilan xotirada yangilanadi.
+    Yuklash lock dan tashqarida bajariladi; shu paytda kelgan natijalar
+    yig'ib turiladi va tayyor reytingga qo'shiladi.
+    """
+
+    def __init__(self, max_tests: int = 256):
+        self.max_tests = max_tests
+        self._lock = threading.Lock()
+        self._boards: "OrderedDict[int, TestLeaderboard]" = OrderedDict()
+        # Yuklanayotgan reytinglar uchun shu paytda kelgan natijalar
+        self._pending: Dict[int, List[Tuple[int, int, Optional[int]]]] = {}
+
+    def get(self, db: Session, test_id: int) -> TestLeaderboard:
+        """Test reytingi (kerak bo'lsa bazadan yuklanadi)"""
+        with self._lock:
+            board = self._boards.get(test_id)
+            if board is not None:
+                self._boards.move_to_end(test_id)
+                return board
+            pending = self._pending.setdefault(test_id, [])
+
+        # Yuklash lock siz - boshqa reytinglar va record() kutib qolmasin
+        loaded = TestLeaderboard()
+        try:
+            rows = db.query(TestResult.user_id, TestResult.percentage, TestResult.time_spent).filter(
+                TestResult.test_id == test_id
+            ).order_by(TestResult.percentage.desc(), TestResult.time_spent.asc()).yield_per(1000)
+            for user_id, percentage, time_spent in rows:
+                loaded.submit(user_id, percentage, time_spent)
+        except Exception:
+            with self._lock:
+                if self._pending.get(test_id) is pending:
+                    del self._pending[test_id]
+            raise
+
+        with self._lock:
+            # Parallel yuklash ulgurgan bo'lsa - o'shanisi qoladi (unga record() lar yozilgan)
+            board = self._boards.get(test_id)
+            if board is not None:
+                return board
+            # Yuklash paytida commit qilingan natijalar so'rovga tushmagan bo'lishi mumkin
+            for result in pending:
+                loaded.submit(*result)
+            if self._pending.get(test_id) is not pending:
+                # Yuklash paytida invalidate qilingan - keshga yozilmaydi
+                return loaded
+            del self._pending[test_id]
+            self._boards[test_id] = loaded
+            while len(self._boards) > self.max_tests:
+                self._boards.popitem(last=False)
+            return loaded
+
+    def record(self, test_id: int, user_id: int, percentage: int, time_spent: Optional[int], broadcast: bool = True) -> None:
+        """Yangi natija - reyting xotirada bo'lsa yangilanadi (boshqa process larda ham)"""
+        self.record_many([(test_id, user_id, percentage, time_spent)], broadcast)
+
+    def record_many(self, results: List[Tuple[int, int, int, Optional[int]]], broadcast: bool = True) -> None:
+        """Bir nechta natija (test_id, user_id, percentage, time_spent) - boshqa process larga bitta xabarda"""
+        with self._lock:
+            for test_id, user_id, percentage, time_spent in results:
+                board = self._boards.get(test_id)
+                if board is not None:
+                    board.submit(user_id, percentage, time_spent)
+                elif test_id in self._pending:
+                    self._pending[test_id].append((user_id, percentage, time_spent))
+        if broadcast:
+            # Postgres NOTIFY payload i 8000 baytgacha - katta batch bo'laklarga bo'linadi
+            for start in range(0, len(results), RESULTS_PER_MESSAGE):
+                invalidation_bus.publish(
+                    "leaderboard_result", json.dumps(results[start:start + RESULTS_PER_MESSAGE]), local=False
+                )
+
+    def invalidate(self, test_id: int, broadcast: bool = True) -> None:
+        with self._lock:
+            self._boards.pop(test_id, None)
+            self._pending.pop(test_id, None)
+        if broadcast:
+            invalidation_bus.publish("leaderboard", str(test_id), local=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._boards.clear()
+            self._pending.clear()
+
+leaderboards = LeaderboardRegistry()
+
+@invalidation_bus.subscribe("leaderboard_result")
+def _record_remote_result(payload: Optional[str]) -> None:
+    if payload is None:
+        leaderboards.clear()
+    else:
+        leaderboards.record_many([tuple(result) for result in json.loads(payload)], broadcast=False)
+
+@invalidation_bus.subscribe("leaderboard")
+def _invalidate_leaderboard(test_id: Optional[str]) -> None:
+    if test_id is None:
+        leaderboards.clear()
+    else:
+        leaderboards.invalidate(int(test_id), broadcast=False)
@@ -1,19 +1,38 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
 from app.database import Base, engine
-from app.routes import auth, videos, tests, teachers, subjects
+from app.background import start_background_jobs, stop_background_jobs
+from app.migrations import run_schema_upgrades
+from app.cache import cache_backend
+from app.invalidation import invalidation_bus, create_transport
+from app.middleware import ConditionalGetMiddleware, CompressionMiddleware
+from app.routes import auth, videos, tests, teachers, subjects, catalog, sync
 from datetime import datetime
 
 # Database tables yaratish
 Base.metadata.create_all(bind=engine)
+run_schema_upgrades(engine)
 
 # FastAPI app
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.API_VERSION,
     description="Madinabonu - Ta'lim platformasi backend API",
-    debug=settings.DEBUG
+    debug=settings.DEBUG,
+    default_response_class=ORJSONResponse
+)
+
+# ETag / 304 (GET javoblari)
+app.add_middleware(ConditionalGetMiddleware)
+
+# gzip/brotli (ETag siqilmagan body dan hisoblanadi - shuning uchun tashqarida)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY
 )
 
 # CORS
@@ -31,6 +50,20 @@ app.include_router(videos.router)
 app.include_router(tests.router)
 app.include_router(teachers.router)
 app.include_router(subjects.router)
+app.include_router(catalog.router)
+app.include_router(sync.router)
+
+@app.on_event("startup")
+async def on_startup():
+    """Fon vazifalarini va invalidatsiya kanalini ishga tushirish"""
+    start_background_jobs()
+    invalidation_bus.start(create_transport(cache_backend, engine, settings.CACHE_INVALIDATION_CHANNEL))
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    """Fon vazifalarini to'xtatish"""
+    await stop_background_jobs()
+    invalidation_bus.stop()
 
 @app.get("/")
 def health_check():
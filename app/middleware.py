@@ -0,0 +1,135 @@
+import hashlib
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.compression import compress, negotiate_encoding
+from app.conditional import etag_matches
+
+# 304 javobida qoldiriladigan header lar (RFC 9110, 15.4.5)
+NOT_MODIFIED_HEADERS = {b"etag", b"last-modified", b"cache-control", b"vary", b"expires", b"content-location"}
+
+class ConditionalGetMiddleware:
+    """
+    GET javoblariga validator (ETag) qo'shish va 304 qaytarish (sof ASGI)
+
+    - Route versioned_by() dependency si bilan validator hisoblagan bo'lsa
+      (request.state.validators), ular javobga qo'shiladi - body buferlanmaydi.
+    - Javobda ETag bo'lmasa, 200 javob body si buferlanadi va undan weak
+      ETag hisoblanadi; If-None-Match mos kelsa body o'rniga 304 yuboriladi.
+    - O'zi ETag qo'ygan javoblar (katalog snapshot) o'zgarishsiz o'tadi.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        start_message = None
+        chunks = []
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                validators = scope.get("state", {}).get("validators")
+                if message["status"] != 200 or "etag" in headers or "no-store" in headers.get("cache-control", ""):
+                    await send(message)
+                elif validators:
+                    for name, value in validators.items():
+                        headers.setdefault(name, value)
+                    await send(message)
+                else:
+                    start_message = message
+                return
+
+            if start_message is None:
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            etag = f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+            headers = MutableHeaders(scope=start_message)
+            headers["ETag"] = etag
+            headers.setdefault("Cache-Control", "no-cache")
+
+            if etag_matches(if_none_match, etag):
+                start_message["status"] = 304
+                start_message["headers"] = [
+                    (name, value) for name, value in start_message["headers"] if name in NOT_MODIFIED_HEADERS
+                ]
+                await send(start_message)
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
+
+# Siqishga arziydigan kontent turlari (rasm/video allaqachon siqilgan)
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml", "image/svg+xml")
+
+class CompressionMiddleware:
+    """
+    Javoblarni gzip/brotli bilan siqish (sof ASGI)
+
+    Encoding Accept-Encoding bo'yicha tanlanadi (brotli o'rnatilgan bo'lsa
+    afzal). Siqilmaydi: minimum_size dan kichik javoblar, siqilmaydigan
+    kontent turlari, allaqachon Content-Encoding qo'yilgan javoblar (masalan
+    oldindan siqilgan katalog snapshot i) va @no_compression route lar.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = {"gzip": gzip_level, "br": brotli_quality}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+        start_message = None
+        chunks = []
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if message["status"] < 200 or message["status"] in (204, 304) \
+                        or "content-encoding" in headers \
+                        or not headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES) \
+                        or getattr(scope.get("endpoint"), "skip_compression", False):
+                    await send(message)
+                else:
+                    start_message = message
+                return
+
+            if start_message is None:
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            headers = MutableHeaders(scope=start_message)
+            if len(body) >= self.minimum_size:
+                headers.add_vary_header("Accept-Encoding")
+                if encoding is not None:
+                    body = compress(body, encoding, self.levels[encoding])
+                    headers["Content-Encoding"] = encoding
+                    headers["Content-Length"] = str(len(body))
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,44 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+# create_all() mavjud jadvallarni o'zgartirmaydi, shuning uchun mavjud
+# bazalarga kerakli indeks/ustunlar shu yerda idempotent DDL bilan qo'shiladi.
+# Yangi o'zgarish - ro'yxat oxiriga yangi statement.
+SCHEMA_UPGRADES = [
+    "CREATE INDEX IF NOT EXISTS ix_test_questions_test_id ON test_questions (test_id)",
+    "ALTER TABLE test_results ADD COLUMN IF NOT EXISTS client_attempt_id VARCHAR(64)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS uq_test_results_user_client_attempt ON test_results (user_id, client_attempt_id)",
+    "CREATE INDEX IF NOT EXISTS ix_test_results_leaderboard ON test_results (test_id, percentage DESC, time_spent)",
+    "CREATE INDEX IF NOT EXISTS ix_test_results_user_created ON test_results (user_id, created_at DESC, id DESC)",
+    "ALTER TABLE tests ADD COLUMN IF NOT EXISTS draw_count INTEGER",
+    "ALTER TABLE test_questions ADD COLUMN IF NOT EXISTS weight DOUBLE PRECISION NOT NULL DEFAULT 1.0",
+    "ALTER TABLE test_results ADD COLUMN IF NOT EXISTS question_ids JSON",
+    "ALTER TABLE test_results ADD COLUMN IF NOT EXISTS answers_packed BYTEA",
+    "ALTER TABLE teachers ADD COLUMN IF NOT EXISTS rating_sum INTEGER NOT NULL DEFAULT 0",
+    "ALTER TABLE teachers ADD COLUMN IF NOT EXISTS rating_count INTEGER NOT NULL DEFAULT 0",
+    "CREATE INDEX IF NOT EXISTS ix_teachers_rating ON teachers (rating DESC, id)",
+    "UPDATE teachers SET rating = 0 WHERE rating IS NULL",
+    # Delta sync: updated_at yaratilganda ham to'ldiriladi va indekslanadi
+    "ALTER TABLE video_categories ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT now()",
+    "ALTER TABLE videos ALTER COLUMN updated_at SET DEFAULT now()",
+    "ALTER TABLE tests ALTER COLUMN updated_at SET DEFAULT now()",
+    "CREATE INDEX IF NOT EXISTS ix_video_categories_updated_at ON video_categories (updated_at)",
+    "CREATE INDEX IF NOT EXISTS ix_videos_updated_at ON videos (updated_at)",
+    "CREATE INDEX IF NOT EXISTS ix_tests_updated_at ON tests (updated_at)",
+    "CREATE INDEX IF NOT EXISTS ix_subjects_updated_at ON subjects (updated_at)",
+    "CREATE INDEX IF NOT EXISTS ix_teachers_updated_at ON teachers (updated_at)",
+    "UPDATE videos SET updated_at = created_at WHERE updated_at IS NULL",
+    "UPDATE tests SET updated_at = created_at WHERE updated_at IS NULL",
+    "UPDATE subjects SET updated_at = created_at WHERE updated_at IS NULL",
+    "UPDATE teachers SET updated_at = created_at WHERE updated_at IS NULL",
+    # Takroriy biriktirishlarni olib tashlab, keyin unique indeks
+    """DELETE FROM teacher_subjects a USING teacher_subjects b
+       WHERE a.teacher_id = b.teacher_id AND a.subject_id = b.subject_id AND a.id > b.id""",
+    "CREATE UNIQUE INDEX IF NOT EXISTS uq_teacher_subjects_teacher_subject ON teacher_subjects (teacher_id, subject_id)",
+]
+
+def run_schema_upgrades(engine: Engine) -> None:
+    """Barcha schema upgrade larni bajarish (startup)"""
+    with engine.begin() as conn:
+        for statement in SCHEMA_UPGRADES:
+            conn.execute(text(statement))
@@ -1,14 +1,21 @@
 from app.models.user import User
-from app.models.video import Video, VideoCategory
-from app.models.test import Test, TestQuestion, TestResult
+from app.models.video import Video, VideoCategory, VideoViewBucket
+from app.models.test import Test, TestQuestion, TestResult, TestQuestionStat
 from app.models.progress import VideoProgress
+from app.models.teacher import Teacher, TeacherRating
+from app.models.sync import Tombstone
 
 __all__ = [
     "User",
     "Video",
     "VideoCategory",
+    "VideoViewBucket",
     "Test",
     "TestQuestion",
     "TestResult",
+    "TestQuestionStat",
     "VideoProgress",
+    "Teacher",
+    "TeacherRating",
+    "Tombstone",
 ]
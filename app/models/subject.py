@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -18,7 +18,7 @@ class Subject(Base):
     order = Column(Integer, default=0)  # Tartib raqami ko'rsatish uchun
     is_active = Column(Integer, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
     # Relationships
     teachers = relationship("TeacherSubject", back_populates="subject")
@@ -36,6 +36,9 @@ class TeacherSubject(Base):
     bir fanni bir nechta o'qituvchi o'qitishi mumkin.
     """
     __tablename__ = "teacher_subjects"
+    __table_args__ = (
+        Index("uq_teacher_subjects_teacher_subject", "teacher_id", "subject_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     teacher_id = Column(Integer, ForeignKey("teachers.id"), nullable=False)
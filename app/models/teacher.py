@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, Float, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, Float, ForeignKey, DateTime, Index, UniqueConstraint, desc
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
 from datetime import datetime
 from app.database import Base
 
@@ -11,6 +12,10 @@ class Teacher(Base):
     o'quvchilarga ta'lim beradi.
     """
     __tablename__ = "teachers"
+    __table_args__ = (
+        # Ro'yxatlarni reyting bo'yicha saralash
+        Index("ix_teachers_rating", desc("rating"), "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), unique=True, nullable=False)
@@ -18,11 +23,13 @@ class Teacher(Base):
     bio = Column(Text, nullable=True)
     avatar_url = Column(String(500), nullable=True)
     experience_years = Column(Integer, default=0)
-    rating = Column(Float, default=0.0)
+    rating = Column(Float, default=0.0)  # Bayes o'rtachasi (app/teacher_stats.py)
+    rating_sum = Column(Integer, default=0, nullable=False)
+    rating_count = Column(Integer, default=0, nullable=False)
     total_students = Column(Integer, default=0)
     total_videos = Column(Integer, default=0)
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
     # Relationships
     user = relationship("User", back_populates="teacher_profile")
@@ -30,4 +37,22 @@ class Teacher(Base):
     subjects = relationship("TeacherSubject", back_populates="teacher")
 
     def __repr__(self):
-        return f"<Teacher {self.full_name}>"
\ No newline at end of file
+        return f"<Teacher {self.full_name}>"
+
+class TeacherRating(Base):
+    """O'quvchining o'qituvchiga bergan bahosi (har o'quvchidan bittadan)"""
+    __tablename__ = "teacher_ratings"
+    __table_args__ = (
+        UniqueConstraint("teacher_id", "user_id", name="uq_teacher_ratings_teacher_user"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    teacher_id = Column(Integer, ForeignKey("teachers.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    score = Column(Integer, nullable=False)  # 1..5
+    comment = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<TeacherRating teacher={self.teacher_id} user={self.user_id} score={self.score}>"
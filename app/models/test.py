@@ -1,6 +1,9 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, JSON
+from typing import List, Optional
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, JSON, Float, Index, LargeBinary, UniqueConstraint, desc
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from app.answer_codec import pack_answers, unpack_answers
+from app.config import settings
 from app.database import Base
 
 class Test(Base):
@@ -15,9 +18,10 @@ class Test(Base):
     subject = Column(String(100), nullable=True)
     time_limit = Column(Integer, default=600)  # soniyalarda (default 10 daqiqa)
     passing_score = Column(Integer, default=70)  # foizda
+    draw_count = Column(Integer, nullable=True)  # har urinishda savollar to'plamidan nechta savol (None - hammasi)
     is_published = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)
 
     # Relationships
     questions = relationship("TestQuestion", back_populates="test", cascade="all, delete-orphan")
@@ -31,13 +35,14 @@ class TestQuestion(Base):
     __tablename__ = "test_questions"
 
     id = Column(Integer, primary_key=True, index=True)
-    test_id = Column(Integer, ForeignKey("tests.id"), nullable=False)
+    test_id = Column(Integer, ForeignKey("tests.id"), nullable=False, index=True)
     question_text = Column(Text, nullable=False)
     options = Column(JSON, nullable=False)  # ["A) Variant 1", "B) Variant 2", ...]
     correct_answer = Column(Integer, nullable=False)  # 0, 1, 2, 3 (index)
     image_url = Column(String(500), nullable=True)
     explanation = Column(Text, nullable=True)
     order = Column(Integer, default=0)
+    weight = Column(Float, default=1.0, nullable=False)  # to'plamdan tanlanish ehtimoli og'irligi
 
     # Relationships
     test = relationship("Test", back_populates="questions")
@@ -48,6 +53,14 @@ class TestQuestion(Base):
 class TestResult(Base):
     """Test natijalari"""
     __tablename__ = "test_results"
+    __table_args__ = (
+        # Offline batch yuborishda takrorlanishdan himoya (idempotency)
+        Index("uq_test_results_user_client_attempt", "user_id", "client_attempt_id", unique=True),
+        # Leaderboard: eng yaxshi foiz, keyin eng kam vaqt
+        Index("ix_test_results_leaderboard", "test_id", desc("percentage"), "time_spent"),
+        # Foydalanuvchi natijalari tarixi (keyset pagination)
+        Index("ix_test_results_user_created", "user_id", desc("created_at"), desc("id")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -57,11 +70,61 @@ class TestResult(Base):
     percentage = Column(Integer, nullable=False)  # foizda
     time_spent = Column(Integer, nullable=True)  # soniyalarda
     passed = Column(Boolean, default=False)
-    answers = Column(JSON, nullable=True)  # foydalanuvchi javoblari
+    answers_json = Column("answers", JSON, nullable=True)  # foydalanuvchi javoblari (JSON format)
+    answers_packed = Column(LargeBinary, nullable=True)  # ixcham format (app/answer_codec.py)
+    question_ids = Column(JSON, nullable=True)  # to'plamli testda tushgan savollar (answers bilan bir tartibda)
+    client_attempt_id = Column(String(64), nullable=True)  # offline rejimda client bergan id
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
     test = relationship("Test", back_populates="results")
 
+    @staticmethod
+    def encode_answers(answers: Optional[List[int]]) -> dict:
+        """
+        Javoblarni saqlash ustunlariga o'girish
+
+        COMPACT_TEST_ANSWERS yoqilgan bo'lsa answers_packed ga, aks holda
+        (yoki javoblar ixcham formatga sig'masa) JSON ustuniga yoziladi.
+        """
+        packed = pack_answers(answers) if answers is not None and settings.COMPACT_TEST_ANSWERS else None
+        if packed is not None:
+            return {"answers_json": None, "answers_packed": packed}
+        return {"answers_json": answers, "answers_packed": None}
+
+    @property
+    def answers(self) -> Optional[List[int]]:
+        """Foydalanuvchi javoblari (qaysi formatda saqlanganidan qat'i nazar)"""
+        if self.answers_packed is not None:
+            return unpack_answers(self.answers_packed)
+        return self.answers_json
+
+    @answers.setter
+    def answers(self, answers: Optional[List[int]]) -> None:
+        for key, value in self.encode_answers(answers).items():
+            setattr(self, key, value)
+
     def __repr__(self):
         return f"<TestResult user={self.user_id} test={self.test_id} score={self.score}>"
+
+class TestQuestionStat(Base):
+    """
+    Savol statistikasi: har bir variant necha marta tanlangan
+
+    Natijalar jadvalini skan qilmaslik uchun submit paytida inkremental
+    yangilanadi. Urinishlar soni - savol bo'yicha pick_count yig'indisi,
+    to'g'ri javoblar - to'g'ri variantdagi pick_count.
+    """
+    __tablename__ = "test_question_stats"
+    __table_args__ = (
+        UniqueConstraint("question_id", "option_index", name="uq_test_question_stats_question_option"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    test_id = Column(Integer, ForeignKey("tests.id", ondelete="CASCADE"), nullable=False, index=True)
+    question_id = Column(Integer, ForeignKey("test_questions.id", ondelete="CASCADE"), nullable=False)
+    option_index = Column(Integer, nullable=False)  # tanlangan variant (-1 va h.k. - javobsiz)
+    pick_count = Column(Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f"<TestQuestionStat question={self.question_id} option={self.option_index} picks={self.pick_count}>"
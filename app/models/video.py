@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -13,6 +13,7 @@ class VideoCategory(Base):
     icon = Column(String(255), nullable=True)
     order = Column(Integer, default=0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)
 
     # Relationships
     videos = relationship("Video", back_populates="category")
@@ -37,7 +38,7 @@ class Video(Base):
     order = Column(Integer, default=0)
     views_count = Column(Integer, default=0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)
 
     # Relationships
     category = relationship("VideoCategory", back_populates="videos")
@@ -46,3 +47,18 @@ class Video(Base):
 
     def __repr__(self):
         return f"<Video {self.title}>"
+
+class VideoViewBucket(Base):
+    """Soatlik ko'rishlar soni (trending reyting uchun)"""
+    __tablename__ = "video_view_buckets"
+    __table_args__ = (
+        UniqueConstraint("video_id", "bucket_start", name="uq_video_view_buckets_video_bucket"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    video_id = Column(Integer, ForeignKey("videos.id", ondelete="CASCADE"), nullable=False)
+    bucket_start = Column(DateTime(timezone=True), nullable=False, index=True)  # soat boshi (UTC)
+    views = Column(Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f"<VideoViewBucket video={self.video_id} {self.bucket_start} views={self.views}>"
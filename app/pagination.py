@@ -0,0 +1,37 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, List
+from fastapi import HTTPException, status
+
+def encode_cursor(*values: Any) -> str:
+    """Keyset pagination uchun shaffof bo'lmagan cursor yaratish"""
+    raw = json.dumps(values, default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def cursor_timestamp(value: Any) -> datetime:
+    """Cursor dagi vaqt (ISO format, timezone bilan)"""
+    if not isinstance(value, str):
+        raise TypeError("timestamp must be a string")
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        raise ValueError("timestamp must be timezone-aware")
+    return parsed
+
+def decode_cursor(cursor: str, *parsers: Callable[[Any], Any]) -> List[Any]:
+    """
+    Cursor ni qiymatlar ro'yxatiga qaytarish
+
+    Har bir qiymat o'z parser i bilan o'giriladi (int, float, cursor_timestamp).
+    Soxta yoki buzilgan cursor - 400.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(parsers):
+            raise ValueError("cursor size mismatch")
+        return [parse(value) for parse, value in zip(parsers, values)]
+    except (TypeError, ValueError, OverflowError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor noto'g'ri"
+        )
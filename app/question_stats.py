@@ -0,0 +1,94 @@
+import threading
+from collections import Counter
+from typing import Dict, List, Sequence
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.background import periodic_job
+from app.config import settings
+from app.models.test import TestQuestion, TestQuestionStat
+
+class QuestionStatsAggregator:
+    """
+    Savol statistikasi uchun bufer
+
+    Submit paytida faqat xotiradagi Counter oshiriladi (so'rovsiz).
+    Fon vazifasi yig'ilgan o'zgarishlarni bitta upsert bilan
+    test_question_stats jadvaliga yozadi.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (test_id, question_id, option_index) -> pick soni
+        self._pending: Counter = Counter()
+
+    def record(self, test_id: int, question_ids: Sequence[int], answers: List[int]) -> None:
+        """Bitta natijadagi tanlovlarni buferga qo'shish (answers[i] - question_ids[i] ga)"""
+        with self._lock:
+            for question_id, option_index in zip(question_ids, answers):
+                self._pending[(test_id, question_id, option_index)] += 1
+
+    def pending_for(self, test_id: int) -> Dict[tuple, int]:
+        """Hali yozilmagan o'zgarishlar: (question_id, option_index) -> soni"""
+        with self._lock:
+            return {
+                (question_id, option_index): count
+                for (pending_test_id, question_id, option_index), count in self._pending.items()
+                if pending_test_id == test_id
+            }
+
+    def discard(self, test_id: int) -> None:
+        """O'chirilgan test uchun hali yozilmagan o'zgarishlarni tashlash"""
+        with self._lock:
+            self._pending = Counter({key: count for key, count in self._pending.items() if key[0] != test_id})
+
+    def flush(self, db: Session) -> None:
+        """Buferni bazaga yozish"""
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+        if not pending:
+            return
+
+        try:
+            self._upsert(db, pending)
+        except IntegrityError:
+            # Bufer yozilguncha savol o'chirilgan bo'lishi mumkin
+            db.rollback()
+            question_ids = {question_id for _, question_id, _ in pending}
+            existing = {
+                question_id for (question_id,) in db.query(TestQuestion.id).filter(
+                    TestQuestion.id.in_(question_ids)
+                ).all()
+            }
+            pending = Counter({key: count for key, count in pending.items() if key[1] in existing})
+            if pending:
+                self._upsert(db, pending)
+        except Exception:
+            db.rollback()
+            with self._lock:
+                self._pending.update(pending)
+            raise
+
+    def _upsert(self, db: Session, pending: Counter) -> None:
+        stmt = insert(TestQuestionStat).values([
+            {
+                "test_id": test_id,
+                "question_id": question_id,
+                "option_index": option_index,
+                "pick_count": count,
+            }
+            for (test_id, question_id, option_index), count in pending.items()
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TestQuestionStat.question_id, TestQuestionStat.option_index],
+            set_={"pick_count": TestQuestionStat.pick_count + stmt.excluded.pick_count}
+        )
+        db.execute(stmt)
+        db.commit()
+
+question_stats = QuestionStatsAggregator()
+
+@periodic_job(settings.QUESTION_STATS_FLUSH_SECONDS, name="question_stats_flush", run_on_shutdown=True)
+def flush_question_stats(db: Session) -> None:
+    """Savol statistikasi buferini davriy yozish"""
+    question_stats.flush(db)
@@ -0,0 +1,147 @@
+import heapq
+import math
+import threading
+from array import array
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy.orm import Session
+from app.background import periodic_job
+from app.config import settings
+from app.models.progress import VideoProgress
+from app.models.video import Video
+
+# Blend og'irliklari: co-watch (cosine) + bir xil fan/kategoriya bonusi
+SAME_SUBJECT_BONUS = 0.3
+SAME_CATEGORY_BONUS = 0.15
+
+class RelatedVideosIndex:
+    """
+    "Buni ko'rganlar buni ham ko'rdi" indeksi
+
+    VideoProgress dan item-to-item co-occurrence matritsasi quriladi.
+    Matritsa siyrak (dict-of-Counter) ko'rinishda saqlanadi va har bir
+    yangilanishda faqat yangi progress yozuvlari qo'shiladi (watermark =
+    oxirgi ko'rilgan VideoProgress.id). Har bir video uchun eng yaqin
+    qo'shnilar ixcham array('i')/array('f') juftligi sifatida xotirada turadi.
+    """
+
+    def __init__(self, neighbors_per_video: int = 50):
+        self.neighbors_per_video = neighbors_per_video
+        self._lock = threading.Lock()
+        self._last_progress_id = 0
+        self._user_videos: Dict[int, Set[int]] = defaultdict(set)
+        self._watchers: Counter = Counter()
+        self._cooccurrence: Dict[int, Counter] = defaultdict(Counter)
+        self._neighbors: Dict[int, Tuple[array, array]] = {}
+        # video_id -> (subject_id, category_id)
+        self._video_meta: Dict[int, Tuple[Optional[int], Optional[int]]] = {}
+        self._by_subject: Dict[int, array] = {}
+        self._by_category: Dict[int, array] = {}
+
+    def refresh(self, db: Session) -> None:
+        """Indeksni yangi progress yozuvlari bilan inkremental yangilash"""
+        with self._lock:
+            self._refresh_metadata(db)
+            rows = db.query(VideoProgress.id, VideoProgress.user_id, VideoProgress.video_id).filter(
+                VideoProgress.id > self._last_progress_id
+            ).order_by(VideoProgress.id).all()
+
+            touched = set()
+            for progress_id, user_id, video_id in rows:
+                self._last_progress_id = progress_id
+                watched = self._user_videos[user_id]
+                if video_id in watched:
+                    continue
+
+                self._watchers[video_id] += 1
+                touched.add(video_id)
+                for other_id in watched:
+                    self._cooccurrence[video_id][other_id] += 1
+                    self._cooccurrence[other_id][video_id] += 1
+                    touched.add(other_id)
+                watched.add(video_id)
+
+            # Watcher soni o'zgargan videolarning qo'shnilari ham qayta baholanadi
+            for video_id in list(touched):
+                touched.update(self._cooccurrence[video_id])
+            for video_id in touched:
+                self._rebuild_neighbors(video_id)
+
+    def _refresh_metadata(self, db: Session) -> None:
+        rows = db.query(Video.id, Video.subject_id, Video.category_id).filter(
+            Video.is_published == True
+        ).order_by(Video.order, Video.id).all()
+
+        by_subject = defaultdict(lambda: array("i"))
+        by_category = defaultdict(lambda: array("i"))
+        meta = {}
+        for video_id, subject_id, category_id in rows:
+            meta[video_id] = (subject_id, category_id)
+            if subject_id is not None:
+                by_subject[subject_id].append(video_id)
+            if category_id is not None:
+                by_category[category_id].append(video_id)
+
+        self._video_meta = meta
+        self._by_subject = dict(by_subject)
+        self._by_category = dict(by_category)
+
+    def _rebuild_neighbors(self, video_id: int) -> None:
+        counts = self._cooccurrence.get(video_id)
+        if not counts:
+            self._neighbors.pop(video_id, None)
+            return
+
+        watchers = self._watchers[video_id]
+        scored = (
+            (count / math.sqrt(watchers * self._watchers[other_id]), other_id)
+            for other_id, count in counts.items()
+        )
+        top = heapq.nlargest(self.neighbors_per_video, scored)
+        self._neighbors[video_id] = (
+            array("i", (other_id for _, other_id in top)),
+            array("f", (score for score, _ in top)),
+        )
+
+    def related(
+        self,
+        video_id: int,
+        subject_id: Optional[int],
+        category_id: Optional[int],
+        limit: int,
+    ) -> List[int]:
+        """Tavsiya etilgan video id lari (eng mosi birinchi)"""
+        meta = self._video_meta
+        scores: Dict[int, float] = {}
+
+        ids, weights = self._neighbors.get(video_id, (array("i"), array("f")))
+        for other_id, weight in zip(ids, weights):
+            if other_id in meta:
+                scores[other_id] = weight
+
+        # Co-watch ma'lumoti kam bo'lsa ham bir xil fan/kategoriyadagi videolar chiqadi
+        if subject_id is not None:
+            for other_id in self._by_subject.get(subject_id, ())[:self.neighbors_per_video]:
+                scores.setdefault(other_id, 0.0)
+        if category_id is not None:
+            for other_id in self._by_category.get(category_id, ())[:self.neighbors_per_video]:
+                scores.setdefault(other_id, 0.0)
+        scores.pop(video_id, None)
+
+        def blended(other_id: int) -> float:
+            other_subject, other_category = meta.get(other_id, (None, None))
+            score = scores[other_id]
+            if subject_id is not None and other_subject == subject_id:
+                score += SAME_SUBJECT_BONUS
+            if category_id is not None and other_category == category_id:
+                score += SAME_CATEGORY_BONUS
+            return score
+
+        return heapq.nlargest(limit, scores, key=blended)
+
+related_videos_index = RelatedVideosIndex()
+
+@periodic_job(settings.RELATED_VIDEOS_REFRESH_SECONDS, name="related_videos_index")
+def refresh_related_videos(db: Session) -> None:
+    """Related videos indeksini davriy yangilash"""
+    related_videos_index.refresh(db)
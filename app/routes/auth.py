@@ -10,6 +10,7 @@ from app.schemas.oauth import OAuthLoginRequest, TokenResponse
 from app.utils import hash_password, verify_password, create_access_token, create_refresh_token
 from app.dependencies import get_current_user, require_admin, require_superadmin
 from app.config import settings
+from app import serialization
 from app.oauth_utils import verify_google_token, verify_apple_token, generate_username_from_email
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
@@ -290,7 +291,7 @@ async def get_all_users(
     Faqat ADMIN va SUPERADMIN uchun
     """
     users = db.query(User).all()
-    return users
+    return serialization.json_response(serialization.user_list, users)
 
 @router.patch("/users/{user_id}/role")
 async def change_user_role(
@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy.orm import Session
+from app.catalog import catalog_snapshot
+from app.compression import negotiate_encoding, no_compression
+from app.database import get_db
+
+router = APIRouter(prefix="/catalog", tags=["Catalog"])
+
+@router.get("/snapshot")
+@no_compression
+async def get_catalog_snapshot(request: Request, db: Session = Depends(get_db)):
+    """
+    To'liq katalog snapshot i (fanlar -> o'qituvchilar -> videolar -> testlar)
+
+    **Public endpoint** - ilova ishga tushganda bitta so'rov bilan butun
+    katalogni oladi. Javob oldindan tayyorlangan va siqilgan (gzip, brotli
+    o'rnatilgan bo'lsa br), ETag - kontent hash. `If-None-Match` mos kelsa
+    304 qaytadi.
+    """
+    snapshot = catalog_snapshot.get(db)
+    headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match.strip() == "*" or snapshot.etag in {tag.strip() for tag in if_none_match.split(",")}:
+        return Response(status_code=304, headers=headers)
+
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"), snapshot.encoded)
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+        return Response(content=snapshot.encoded[encoding], media_type="application/json", headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
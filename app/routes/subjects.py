@@ -1,12 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Literal, Optional
 from app.database import get_db
 from app.models.user import User
-from app.models.subject import Subject, TeacherSubject
-from app.models.teacher import Teacher
+from app.models.subject import Subject
 from app.schemas.teacher import SubjectCreate, SubjectUpdate, SubjectResponse, TeacherListItem
 from app.dependencies import require_admin
+from app.teacher_listing import list_teachers
+from app.cache import cached, response_cache
 
 router = APIRouter(prefix="/subjects", tags=["Subjects"])
 
@@ -37,11 +38,13 @@ async def create_subject(
 
     db.add(new_subject)
     db.commit()
+    response_cache.invalidate("subjects")
     db.refresh(new_subject)
 
     return new_subject
 
 @router.get("/", response_model=List[SubjectResponse])
+@cached(List[SubjectResponse], tags=("subjects",))
 async def get_all_subjects(
     is_active: Optional[bool] = Query(None, description="Faol fanlarni filter qilish"),
     limit: int = Query(50, ge=1, le=100),
@@ -122,6 +125,7 @@ async def update_subject(
         setattr(subject, field, value)
 
     db.commit()
+    response_cache.invalidate("subjects")
     db.refresh(subject)
 
     return subject
@@ -147,6 +151,7 @@ async def delete_subject(
 
     db.delete(subject)
     db.commit()
+    response_cache.invalidate("subjects")
 
     return None
 
@@ -155,28 +160,26 @@ async def delete_subject(
 @router.get("/{subject_id}/teachers", response_model=List[TeacherListItem])
 async def get_subject_teachers(
     subject_id: int,
+    response: Response,
+    include: Optional[Literal["subjects"]] = Query(None, description="subjects - fanlarni ham qaytarish"),
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Oldingi javobdagi X-Next-Cursor"),
     db: Session = Depends(get_db)
 ):
     """
-    Fanni o'qitadigan barcha o'qituvchilarni olish
+    Fanni o'qitadigan barcha o'qituvchilarni olish (reyting bo'yicha)
 
     **Public endpoint** - hamma ko'ra oladi.
-    Ma'lum fan bo'yicha o'qituvchilar ro'yxati.
+    Ma'lum fan bo'yicha o'qituvchilar ro'yxati. `include=subjects` bilan
+    o'qituvchilarning barcha fanlari ham qaytariladi.
     """
 
     # Subject mavjudligini tekshirish
-    subject = db.query(Subject).filter(Subject.id == subject_id).first()
+    subject = db.query(Subject.id).filter(Subject.id == subject_id).first()
     if not subject:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Fan topilmadi"
         )
 
-    # O'qituvchilarni olish
-    teachers = db.query(Teacher).join(TeacherSubject).filter(
-        TeacherSubject.subject_id == subject_id
-    ).offset(offset).limit(limit).all()
-
-    return teachers
\ No newline at end of file
+    return list_teachers(db, response, subject_id, limit, cursor, include_subjects=include == "subjects")
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.database import get_db
+from app.schemas.sync import SyncResponse
+from app.sync import collect_changes
+
+router = APIRouter(prefix="/sync", tags=["Sync"])
+
+@router.get("", response_model=SyncResponse)
+async def sync_changes(
+    since: Optional[str] = Query(None, description="Oldingi sync javobidagi cursor"),
+    db: Session = Depends(get_db)
+):
+    """
+    Oxirgi sync dan keyingi o'zgarishlar
+
+    **Public endpoint** - nashr qilingan videolar va testlar, fanlar,
+    o'qituvchilar va kategoriyalarning yaratilgan/o'zgargan yozuvlari hamda
+    o'chirilganlar yoki nashrdan olinganlar (`deleted`). `since` berilmasa
+    (yoki cursor juda eski bo'lsa) to'liq ro'yxat qaytadi - javobda
+    `full: true`. Javobdagi `cursor` ni keyingi so'rovda `since` ga bering.
+    """
+    return collect_changes(db, since)
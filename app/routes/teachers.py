@@ -1,15 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Literal, Optional
 from app.database import get_db
 from app.models.user import User
 from app.models.teacher import Teacher
 from app.models.subject import Subject, TeacherSubject
 from app.schemas.teacher import (
     TeacherCreate, TeacherUpdate, TeacherResponse, TeacherListItem,
-    TeacherSubjectCreate, TeacherSubjectResponse
+    TeacherSubjectCreate, TeacherSubjectResponse,
+    TeacherRatingCreate, TeacherRatingResponse, TeacherSubjectBulkResponse
 )
 from app.dependencies import get_current_user, require_admin
+from app.teacher_stats import rate_teacher
+from app.teacher_listing import list_teachers
 
 router = APIRouter(prefix="/teachers", tags=["Teachers"])
 
@@ -61,26 +65,23 @@ async def create_teacher(
 
 @router.get("/", response_model=List[TeacherListItem])
 async def get_all_teachers(
+    response: Response,
     subject_id: Optional[int] = Query(None, description="Fan bo'yicha filter"),
+    include: Optional[Literal["subjects"]] = Query(None, description="subjects - fanlarni ham qaytarish"),
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Oldingi javobdagi X-Next-Cursor"),
     db: Session = Depends(get_db)
 ):
     """
-    Barcha o'qituvchilarni olish
+    Barcha o'qituvchilarni olish (reyting bo'yicha saralangan)
 
     **Public endpoint** - hamma ko'ra oladi.
     Subject_id orqali ma'lum fanni o'qitadigan o'qituvchilarni filter qilish mumkin.
+    `include=subjects` bilan har bir o'qituvchining fanlari ham qaytariladi.
+    Keyingi sahifa uchun `X-Next-Cursor` header dagi qiymatni `cursor` ga bering.
     """
 
-    query = db.query(Teacher)
-
-    # Fan bo'yicha filter
-    if subject_id:
-        query = query.join(TeacherSubject).filter(TeacherSubject.subject_id == subject_id)
-
-    teachers = query.offset(offset).limit(limit).all()
-    return teachers
+    return list_teachers(db, response, subject_id, limit, cursor, include_subjects=include == "subjects")
 
 @router.get("/{teacher_id}", response_model=TeacherResponse)
 async def get_teacher_by_id(
@@ -102,6 +103,46 @@ async def get_teacher_by_id(
 
     return teacher
 
+@router.post("/{teacher_id}/rate", response_model=TeacherRatingResponse)
+async def rate_teacher_endpoint(
+    teacher_id: int,
+    rating_data: TeacherRatingCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    O'qituvchiga baho qo'yish (1-5)
+
+    Har bir foydalanuvchi bitta baho qo'yadi; qayta yuborilsa baho yangilanadi.
+    Reyting agregati bahoni saqlash bilan bitta statement da yangilanadi.
+    """
+
+    teacher = db.query(Teacher.id, Teacher.user_id).filter(Teacher.id == teacher_id).first()
+    if not teacher:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="O'qituvchi topilmadi"
+        )
+
+    if teacher.user_id == current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="O'zingizga baho qo'ya olmaysiz"
+        )
+
+    rating, rating_count, rating_sum = rate_teacher(
+        db, teacher_id, current_user.id, rating_data.score, rating_data.comment
+    )
+    db.commit()
+
+    return TeacherRatingResponse(
+        teacher_id=teacher_id,
+        score=rating_data.score,
+        rating=rating,
+        rating_count=rating_count,
+        rating_average=rating_sum / rating_count
+    )
+
 @router.patch("/{teacher_id}", response_model=TeacherResponse)
 async def update_teacher(
     teacher_id: int,
@@ -217,6 +258,68 @@ async def assign_teacher_to_subject(
 
     return new_assignment
 
+@router.post("/subjects/assign/bulk", response_model=TeacherSubjectBulkResponse, status_code=status.HTTP_201_CREATED)
+async def bulk_assign_teachers_to_subjects(
+    assignments: List[TeacherSubjectCreate],
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(require_admin)
+):
+    """
+    Ko'p o'qituvchini fanlarga bittada biriktirish
+
+    **Faqat ADMIN va SUPERADMIN uchun.**
+    Id lar ikki IN so'rov bilan tekshiriladi, yangi juftliklar bitta
+    INSERT ... ON CONFLICT DO NOTHING bilan qo'shiladi. Avval mavjud
+    bo'lganlari `existing` da qaytariladi.
+    """
+
+    if len(assignments) > 1000:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Bitta so'rovda ko'pi bilan 1000 ta biriktirish"
+        )
+
+    pairs = list(dict.fromkeys((item.teacher_id, item.subject_id) for item in assignments))
+    if not pairs:
+        return TeacherSubjectBulkResponse(created=[], existing=[])
+
+    teacher_ids = {teacher_id for teacher_id, _ in pairs}
+    subject_ids = {subject_id for _, subject_id in pairs}
+    missing_teachers = teacher_ids - {
+        teacher_id for (teacher_id,) in db.query(Teacher.id).filter(Teacher.id.in_(teacher_ids)).all()
+    }
+    if missing_teachers:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"O'qituvchi topilmadi: {', '.join(map(str, sorted(missing_teachers)))}"
+        )
+    missing_subjects = subject_ids - {
+        subject_id for (subject_id,) in db.query(Subject.id).filter(Subject.id.in_(subject_ids)).all()
+    }
+    if missing_subjects:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Fan topilmadi: {', '.join(map(str, sorted(missing_subjects)))}"
+        )
+
+    stmt = insert(TeacherSubject).on_conflict_do_nothing(
+        index_elements=[TeacherSubject.teacher_id, TeacherSubject.subject_id]
+    ).returning(TeacherSubject)
+    created = db.scalars(
+        stmt, [{"teacher_id": teacher_id, "subject_id": subject_id} for teacher_id, subject_id in pairs]
+    ).all()
+    created_pairs = {(row.teacher_id, row.subject_id) for row in created}
+    response = TeacherSubjectBulkResponse(
+        created=created,
+        existing=[
+            TeacherSubjectCreate(teacher_id=teacher_id, subject_id=subject_id)
+            for teacher_id, subject_id in pairs if (teacher_id, subject_id) not in created_pairs
+        ]
+    )
+    db.commit()
+
+    return response
+
 @router.delete("/subjects/unassign/{teacher_id}/{subject_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def unassign_teacher_from_subject(
     teacher_id: int,
@@ -1,11 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, BackgroundTasks
+from sqlalchemy import func, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, selectinload
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional, Literal
+from datetime import datetime, timedelta, timezone
+from collections import Counter, defaultdict
+import random
+import secrets
+import shutil
+import tempfile
 from app.database import get_db
-from app.models.test import Test, TestQuestion, TestResult
+from app.models.test import Test, TestQuestion, TestResult, TestQuestionStat
 from app.models.user import User
-from app.schemas.test import TestCreate, TestResponse, TestResultCreate, TestResultResponse
+from app.schemas.test import (
+    TestCreate, TestResponse, TestSummaryResponse, TestAttemptResponse,
+    TestResultCreate, TestResultResponse, TestResultBatchItem, TestResultBatchItemResponse,
+    TestAnalyticsResponse, LeaderboardResponse, TestResultsPage, TestImportJobResponse
+)
 from app.dependencies import get_current_user, require_teacher
+from app.test_import import import_jobs, detect_format, run_import
+from app.answer_keys import answer_key_cache
+from app.pagination import encode_cursor, decode_cursor, cursor_timestamp
+from app.attempts import attempt_store
+from app.question_stats import question_stats
+from app.leaderboard import leaderboards
+from app.cache import single_flight
+from app.conditional import versioned_by
+from app import serialization
+from app.config import settings
 
 router = APIRouter(prefix="/tests", tags=["Tests"])
 
@@ -25,7 +48,8 @@ async def create_test(
         subject=test_data.subject,
         time_limit=test_data.time_limit,
         passing_score=test_data.passing_score,
-        is_published=test_data.is_published
+        is_published=test_data.is_published,
+        draw_count=test_data.draw_count
     )
     db.add(test)
     db.flush()  # ID olish uchun
@@ -42,14 +66,72 @@ async def create_test(
     db.refresh(test)
     return test
 
-@router.get("/", response_model=List[TestResponse])
+@router.post("/import", response_model=TestImportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def import_tests(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(..., description="CSV, JSON yoki JSONL fayl"),
+    current_user: User = Depends(require_teacher)
+):
+    """
+    Testlar va savollarni fayldan import qilish (Teacher+)
+
+    - **CSV**: har bir qator - bitta savol. Ustunlar: test_title, test_description,
+      test_video_id, test_category, test_subject, test_time_limit, test_passing_score,
+      test_is_published, test_draw_count, question_text, options ("|" bilan
+      ajratilgan), correct_answer, image_url, explanation, order, weight. Ketma-ket bir xil
+      test_title li qatorlar bitta test.
+    - **JSON**: TestCreate lar ro'yxati; **JSONL**: har qatorda bitta TestCreate.
+
+    Import fonda, bitta tranzaksiyada bajariladi. Jarayonni
+    `GET /tests/import/{job_id}` orqali kuzatish mumkin.
+    """
+    file_format = detect_format(file.filename)
+    if file_format is None:
+        raise HTTPException(status_code=400, detail="Faqat .csv, .json, .jsonl fayllar qabul qilinadi")
+
+    # Upload fonda o'qilishi uchun vaqtinchalik faylga ko'chiriladi (threadpool da - event loop bloklanmaydi)
+    stream = tempfile.TemporaryFile()
+    await run_in_threadpool(shutil.copyfileobj, file.file, stream)
+    stream.seek(0)
+
+    job = import_jobs.create(current_user.id, file_format)
+    background_tasks.add_task(run_import, job, stream)
+    return job
+
+@router.get("/import/{job_id}", response_model=TestImportJobResponse)
+async def get_import_job(
+    job_id: str,
+    current_user: User = Depends(require_teacher)
+):
+    """
+    Import jarayoni holati (Teacher+)
+
+    Holat kesh omborida saqlanadi (24 soat). CACHE_URL=memory:// bo'lsa u
+    faqat faylni qabul qilgan worker da bor - boshqa worker 404 qaytaradi;
+    bir nechta worker bilan Redis (CACHE_URL=redis://...) kerak.
+    """
+    job = import_jobs.get(job_id)
+    if job is None or (job.user_id != current_user.id and not current_user.is_admin):
+        raise HTTPException(status_code=404, detail="Import topilmadi")
+    return job
+
+@router.get("/", response_model=List[TestSummaryResponse], dependencies=[versioned_by(Test, TestQuestion)])
 async def get_tests(
     category: Optional[str] = Query(None),
     subject: Optional[str] = Query(None),
     video_id: Optional[int] = Query(None),
+    include: Optional[Literal["questions"]] = Query(None, description="questions - savollarni ham qaytarish"),
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Oldingi javobdagi X-Next-Cursor"),
     db: Session = Depends(get_db)
 ):
-    """Testlarni olish (filter bilan)"""
+    """
+    Testlarni olish (filter bilan)
+
+    Default holatda qisqa ma'lumot va savollar soni qaytariladi.
+    `include=questions` bilan savollar bitta qo'shimcha so'rovda yuklanadi.
+    Keyingi sahifa uchun `X-Next-Cursor` header dagi qiymatni `cursor` ga bering.
+    """
     query = db.query(Test).filter(Test.is_published == True)
 
     if category:
@@ -58,75 +140,439 @@ async def get_tests(
         query = query.filter(Test.subject == subject)
     if video_id:
         query = query.filter(Test.video_id == video_id)
+    if cursor:
+        created_at, last_id = decode_cursor(cursor, cursor_timestamp, int)
+        query = query.filter(
+            tuple_(Test.created_at, Test.id) < (created_at, last_id)
+        )
+    if include == "questions":
+        query = query.options(selectinload(Test.questions))
+
+    tests = query.order_by(Test.created_at.desc(), Test.id.desc()).limit(limit + 1).all()
+    headers = None
+    if len(tests) > limit:
+        tests = tests[:limit]
+        headers = {"X-Next-Cursor": encode_cursor(tests[-1].created_at.isoformat(), tests[-1].id)}
 
-    return query.order_by(Test.created_at.desc()).all()
+    if include == "questions":
+        question_counts = {test.id: len(test.questions) for test in tests}
+    else:
+        # Faqat shu sahifadagi testlar uchun guruhlangan COUNT
+        question_counts = dict(db.query(TestQuestion.test_id, func.count(TestQuestion.id)).filter(
+            TestQuestion.test_id.in_([test.id for test in tests])
+        ).group_by(TestQuestion.test_id).all()) if tests else {}
+
+    # Oraliq dict larsiz - to'g'ridan-to'g'ri JSON baytlarga
+    return serialization.json_response(serialization.test_summary_list, [
+        TestSummaryResponse(
+            id=test.id,
+            title=test.title,
+            description=test.description,
+            video_id=test.video_id,
+            category=test.category,
+            subject=test.subject,
+            time_limit=test.time_limit,
+            passing_score=test.passing_score,
+            is_published=test.is_published,
+            draw_count=test.draw_count,
+            created_at=test.created_at,
+            question_count=question_counts.get(test.id, 0),
+            questions=test.questions if include == "questions" else None
+        )
+        for test in tests
+    ], headers=headers)
 
 @router.get("/{test_id}", response_model=TestResponse)
-async def get_test(test_id: int, db: Session = Depends(get_db)):
-    """Bitta testni olish"""
+@single_flight(TestResponse)
+def get_test(test_id: int, db: Session = Depends(get_db)):
+    """Bitta testni olish (bir vaqtdagi bir xil so'rovlar birlashadi)"""
     test = db.query(Test).filter(Test.id == test_id).first()
     if not test:
         raise HTTPException(status_code=404, detail="Test topilmadi")
     return test
 
+@router.post("/{test_id}/start", response_model=TestAttemptResponse)
+async def start_test(
+    test_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Testni boshlash
+
+    To'g'ri javoblarsiz test payload i va server tomonda saqlanadigan
+    urinish (attempt_id) qaytaradi. Savollar `question_order` tartibida
+    ko'rsatiladi va javoblar ham shu tartibda yuboriladi.
+    """
+    answer_key = answer_key_cache.get(db, test_id)
+    if answer_key is None or not answer_key.is_published:
+        raise HTTPException(status_code=404, detail="Test topilmadi")
+
+    positions = answer_key.draw_positions(random.Random(secrets.randbits(64)))
+    attempt = attempt_store.create(
+        user_id=current_user.id,
+        test_id=answer_key.test_id,
+        key_fingerprint=answer_key.fingerprint,
+        positions=positions,
+        ttl_seconds=answer_key.time_limit + settings.TEST_ATTEMPT_GRACE_SECONDS
+    )
+    started_at = datetime.fromtimestamp(attempt.started_at, tz=timezone.utc)
+
+    if answer_key.is_pool:
+        # To'plamli test: faqat tushgan savollar, ko'rsatish tartibida
+        delivery = answer_key.delivery.model_copy(update={
+            "questions": [answer_key.delivery.questions[position] for position in positions]
+        })
+        question_order = list(range(len(positions)))
+    else:
+        delivery = answer_key.delivery
+        question_order = positions
+
+    return TestAttemptResponse(
+        attempt_id=attempt.attempt_id,
+        started_at=started_at,
+        expires_at=started_at + timedelta(seconds=answer_key.time_limit),
+        question_order=question_order,
+        test=delivery
+    )
+
 @router.post("/submit", response_model=TestResultResponse)
 async def submit_test(
     result_data: TestResultCreate,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Test natijasini yuborish"""
+    """
+    Test natijasini yuborish
 
-    # Testni topish
-    test = db.query(Test).filter(Test.id == result_data.test_id).first()
-    if not test:
+    Javoblar kaliti keshdan olinadi, shuning uchun odatda yagona
+    so'rov - natijani INSERT qilish. attempt_id berilsa vaqt limiti
+    server tomonda tekshiriladi va savollar tartibi urinishdan olinadi.
+    """
+
+    answer_key = answer_key_cache.get(db, result_data.test_id)
+    if answer_key is None:
         raise HTTPException(status_code=404, detail="Test topilmadi")
 
-    # Savollarni olish
-    questions = db.query(TestQuestion).filter(TestQuestion.test_id == test.id).order_by(TestQuestion.order).all()
+    answers = result_data.answers
+    positions = None
+    time_spent = result_data.time_spent
+    if result_data.attempt_id:
+        attempt = attempt_store.get(result_data.attempt_id)
+        if attempt is None or attempt.user_id != current_user.id or attempt.test_id != answer_key.test_id:
+            raise HTTPException(status_code=400, detail="Urinish topilmadi yoki muddati tugagan")
+        if attempt.key_fingerprint != answer_key.fingerprint:
+            raise HTTPException(status_code=409, detail="Test urinish davomida o'zgartirildi")
+        if attempt.elapsed > answer_key.time_limit + settings.TEST_ATTEMPT_GRACE_SECONDS:
+            raise HTTPException(status_code=400, detail="Test vaqti tugagan")
+        time_spent = min(int(attempt.elapsed), answer_key.time_limit)
+    elif answer_key.is_pool:
+        raise HTTPException(status_code=400, detail="Bu test uchun avval POST /tests/{id}/start chaqiring")
 
-    if len(result_data.answers) != len(questions):
+    if len(answers) != answer_key.total_questions:
         raise HTTPException(status_code=400, detail="Javoblar soni savollar soniga mos emas")
 
-    # Natijani hisoblash
-    score = 0
-    for i, question in enumerate(questions):
-        if i < len(result_data.answers) and result_data.answers[i] == question.correct_answer:
-            score += 1
+    if result_data.attempt_id:
+        # Javoblar urinishdagi tartibda keladi - kalit tartibiga o'tkaziladi
+        positions, answers = attempt.canonical_answers(answers)
+        if not answer_key.is_pool:
+            positions = None
 
-    total_questions = len(questions)
-    percentage = int((score / total_questions) * 100) if total_questions > 0 else 0
-    passed = percentage >= test.passing_score
+    # Natijani hisoblash
+    score, percentage, passed = answer_key.grade(answers, positions)
+    question_ids = None
+    if positions is not None:
+        question_ids = [answer_key.question_ids[position] for position in positions]
 
     # Natijani saqlash
     test_result = TestResult(
         user_id=current_user.id,
-        test_id=test.id,
+        test_id=answer_key.test_id,
         score=score,
-        total_questions=total_questions,
+        total_questions=answer_key.total_questions,
         percentage=percentage,
-        time_spent=result_data.time_spent,
+        time_spent=time_spent,
         passed=passed,
-        answers=result_data.answers
+        answers=answers,
+        question_ids=question_ids
     )
 
     db.add(test_result)
+    db.flush()  # INSERT ... RETURNING id, created_at
+
+    # Commit dan keyin qayta SELECT qilmaslik uchun javob oldindan tayyorlanadi
+    response = TestResultResponse.model_validate(test_result)
     db.commit()
-    db.refresh(test_result)
 
-    return test_result
+    if result_data.attempt_id:
+        attempt_store.discard(result_data.attempt_id)
+    question_stats.record(
+        answer_key.test_id, answer_key.question_ids if question_ids is None else question_ids,
+        answer_key.stat_answers(answers, positions)
+    )
+    leaderboards.record(answer_key.test_id, current_user.id, percentage, time_spent)
+
+    return response
+
+@router.post("/submit/batch", response_model=List[TestResultBatchItemResponse])
+async def submit_test_batch(
+    items: List[TestResultBatchItem],
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Offline rejimda yig'ilgan natijalarni bittada yuborish
 
-@router.get("/results/me", response_model=List[TestResultResponse])
+    Har bir natija client_attempt_id bilan keladi: qayta yuborilganda
+    yangi natija yaratilmaydi, avval saqlangani "duplicate" sifatida qaytadi.
+    Javoblar kalitlari bitta so'rovda yuklanadi, natijalar bitta INSERT bilan saqlanadi.
+    """
+    if len(items) > 1000:
+        raise HTTPException(status_code=400, detail="Bitta batch da ko'pi bilan 1000 ta natija")
+
+    client_ids = [item.client_attempt_id for item in items]
+    existing = {
+        result.client_attempt_id: result
+        for result in db.query(TestResult).filter(
+            TestResult.user_id == current_user.id,
+            TestResult.client_attempt_id.in_(client_ids)
+        ).all()
+    } if items else {}
+
+    answer_keys = answer_key_cache.get_many(
+        db, [item.test_id for item in items if item.client_attempt_id not in existing]
+    )
+
+    statuses = {}
+    rows = []
+    for item in items:
+        if item.client_attempt_id in existing or item.client_attempt_id in statuses:
+            continue
+
+        answer_key = answer_keys.get(item.test_id)
+        if answer_key is None:
+            statuses[item.client_attempt_id] = ("error", "Test topilmadi")
+            continue
+        if answer_key.is_pool:
+            statuses[item.client_attempt_id] = ("error", "To'plamli testlar offline topshirilmaydi")
+            continue
+        if len(item.answers) != answer_key.total_questions:
+            statuses[item.client_attempt_id] = ("error", "Javoblar soni savollar soniga mos emas")
+            continue
+
+        score, percentage, passed = answer_key.grade(item.answers)
+        statuses[item.client_attempt_id] = ("created", None)
+        rows.append({
+            "user_id": current_user.id,
+            "test_id": answer_key.test_id,
+            "score": score,
+            "total_questions": answer_key.total_questions,
+            "percentage": percentage,
+            "time_spent": item.time_spent,
+            "passed": passed,
+            "client_attempt_id": item.client_attempt_id,
+            **TestResult.encode_answers(item.answers),
+        })
+
+    created = {}
+    if rows:
+        stmt = insert(TestResult).on_conflict_do_nothing(
+            index_elements=[TestResult.user_id, TestResult.client_attempt_id]
+        ).returning(TestResult)
+        created = {result.client_attempt_id: result for result in db.scalars(stmt, rows)}
+
+        # Parallel so'rov allaqachon saqlagan bo'lsa - duplicate
+        raced_ids = [row["client_attempt_id"] for row in rows if row["client_attempt_id"] not in created]
+        if raced_ids:
+            existing.update({
+                result.client_attempt_id: result
+                for result in db.query(TestResult).filter(
+                    TestResult.user_id == current_user.id,
+                    TestResult.client_attempt_id.in_(raced_ids)
+                ).all()
+            })
+
+    response = []
+    reported = set()
+    for item in items:
+        client_id = item.client_attempt_id
+        if client_id in created and client_id not in reported:
+            response.append(TestResultBatchItemResponse(
+                client_attempt_id=client_id, status="created", result=created[client_id]
+            ))
+        elif client_id in created:
+            # Bitta batch ichida takrorlangan client_attempt_id
+            response.append(TestResultBatchItemResponse(
+                client_attempt_id=client_id, status="duplicate", result=created[client_id]
+            ))
+        elif client_id in existing:
+            response.append(TestResultBatchItemResponse(
+                client_attempt_id=client_id, status="duplicate", result=existing[client_id]
+            ))
+        else:
+            _, detail = statuses[client_id]
+            response.append(TestResultBatchItemResponse(
+                client_attempt_id=client_id, status="error", detail=detail
+            ))
+        reported.add(client_id)
+
+    # Commit dan keyin obyektlar expire bo'ladi - qiymatlar oldindan olinadi
+    recorded = [
+        (result.test_id, result.answers, result.percentage, result.time_spent) for result in created.values()
+    ]
+    db.commit()
+
+    # Xotiradagi statistika faqat saqlangan natijalar bilan yangilanadi
+    for test_id, answers, _, _ in recorded:
+        question_stats.record(test_id, answer_keys[test_id].question_ids, answer_keys[test_id].stat_answers(answers))
+    leaderboards.record_many([
+        (test_id, current_user.id, percentage, time_spent) for test_id, _, percentage, time_spent in recorded
+    ])
+
+    return response
+
+@router.get("/results/me", response_model=TestResultsPage)
 async def get_my_results(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Oldingi sahifadagi next_cursor"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    O'zimning test natijalarim
+
+    Natijalar yangilaridan boshlab sahifalab qaytariladi. Birinchi sahifada
+    umumiy statistika (summary) ham bitta guruhlangan so'rov bilan hisoblanadi.
+    """
+    query = db.query(TestResult).filter(TestResult.user_id == current_user.id)
+    if cursor:
+        created_at, last_id = decode_cursor(cursor, cursor_timestamp, int)
+        query = query.filter(
+            tuple_(TestResult.created_at, TestResult.id) < (created_at, last_id)
+        )
+
+    results = query.order_by(TestResult.created_at.desc(), TestResult.id.desc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(results) > limit:
+        results = results[:limit]
+        next_cursor = encode_cursor(results[-1].created_at.isoformat(), results[-1].id)
+
+    summary = None
+    if not cursor:
+        per_test = db.query(
+            TestResult.test_id,
+            func.count(TestResult.id),
+            func.count(TestResult.id).filter(TestResult.passed == True),
+            func.sum(TestResult.percentage),
+            func.max(TestResult.percentage),
+        ).filter(
+            TestResult.user_id == current_user.id
+        ).group_by(TestResult.test_id).order_by(TestResult.test_id).all()
+
+        total_attempts = sum(row[1] for row in per_test)
+        passed_attempts = sum(row[2] for row in per_test)
+        summary = {
+            "total_attempts": total_attempts,
+            "passed_attempts": passed_attempts,
+            "pass_rate": passed_attempts / total_attempts if total_attempts else 0.0,
+            "average_percentage": sum(row[3] for row in per_test) / total_attempts if total_attempts else 0.0,
+            "best_per_test": [
+                {"test_id": test_id, "attempts": attempts, "best_percentage": best, "passed": passed > 0}
+                for test_id, attempts, passed, _, best in per_test
+            ],
+        }
+
+    return {"items": results, "next_cursor": next_cursor, "summary": summary}
+
+@router.get("/{test_id}/analytics", response_model=TestAnalyticsResponse, dependencies=[Depends(require_teacher)])
+async def get_test_analytics(test_id: int, db: Session = Depends(get_db)):
+    """
+    Savollar bo'yicha statistika (Teacher+)
+
+    Qiyinlik (to'g'ri javoblar ulushi) va variantlar qanchalik tanlangani.
+    Oldindan yig'ilgan test_question_stats dan o'qiladi, natijalar soniga bog'liq emas.
+    """
+    answer_key = answer_key_cache.get(db, test_id)
+    if answer_key is None:
+        raise HTTPException(status_code=404, detail="Test topilmadi")
+
+    picks = Counter(dict(
+        ((question_id, option_index), pick_count)
+        for question_id, option_index, pick_count in db.query(
+            TestQuestionStat.question_id, TestQuestionStat.option_index, TestQuestionStat.pick_count
+        ).filter(TestQuestionStat.test_id == test_id).all()
+    ))
+    picks.update(question_stats.pending_for(test_id))
+
+    per_question = defaultdict(dict)
+    for (question_id, option_index), count in picks.items():
+        per_question[question_id][option_index] = count
+
+    questions = []
+    for question_id, correct_answer, question in zip(
+        answer_key.question_ids, answer_key.correct, answer_key.delivery.questions
+    ):
+        counts = per_question.get(question_id, {})
+        option_counts = [counts.get(i, 0) for i in range(len(question.options))]
+        attempt_count = sum(counts.values())
+        correct_count = counts.get(correct_answer, 0)
+        questions.append({
+            "question_id": question_id,
+            "attempt_count": attempt_count,
+            "correct_count": correct_count,
+            "correct_rate": correct_count / attempt_count if attempt_count else 0.0,
+            "option_counts": option_counts,
+            "unanswered_count": attempt_count - sum(option_counts),
+        })
+
+    return {
+        "test_id": test_id,
+        "attempt_count": max((q["attempt_count"] for q in questions), default=0),
+        "questions": questions,
+    }
+
+@router.get("/{test_id}/leaderboard", response_model=LeaderboardResponse)
+async def get_test_leaderboard(
+    test_id: int,
+    limit: int = Query(10, ge=1, le=100),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """O'zimning test natijalarim"""
-    results = db.query(TestResult).filter(
-        TestResult.user_id == current_user.id
-    ).order_by(TestResult.created_at.desc()).all()
+    """
+    Test reytingi
+
+    Har bir foydalanuvchining eng yaxshi foizi, teng bo'lsa kamroq vaqt.
+    Reyting xotirada saqlanadi; joriy foydalanuvchi o'rni ham qaytariladi.
+    """
+    if answer_key_cache.get(db, test_id) is None:
+        raise HTTPException(status_code=404, detail="Test topilmadi")
+
+    board = leaderboards.get(db, test_id)
+    top = board.top(limit)
+
+    users = {
+        user.id: user
+        for user in db.query(User).filter(User.id.in_([user_id for _, user_id, _, _ in top])).all()
+    } if top else {}
+
+    entries = [
+        {
+            "rank": rank,
+            "user_id": user_id,
+            "username": users[user_id].username if user_id in users else None,
+            "full_name": users[user_id].full_name if user_id in users else None,
+            "percentage": percentage,
+            "time_spent": time_spent,
+        }
+        for rank, user_id, percentage, time_spent in top
+    ]
 
-    return results
+    return {
+        "test_id": test_id,
+        "total_participants": len(board),
+        "entries": entries,
+        "my_rank": board.rank(current_user.id),
+    }
 
 @router.delete("/{test_id}", dependencies=[Depends(require_teacher)])
 async def delete_test(test_id: int, db: Session = Depends(get_db)):
@@ -137,4 +583,7 @@ async def delete_test(test_id: int, db: Session = Depends(get_db)):
 
     db.delete(test)
     db.commit()
+    answer_key_cache.invalidate(test_id)
+    leaderboards.invalidate(test_id)
+    question_stats.discard(test_id)
     return {"message": "Test o'chirildi"}
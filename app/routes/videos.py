@@ -1,11 +1,25 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import update, values, column, cast, func, Integer, Boolean
+from sqlalchemy.orm import Session, selectinload
 from typing import List, Optional
 from app.database import get_db
 from app.models.video import Video, VideoCategory
+from app.models.progress import VideoProgress
+from app.models.teacher import Teacher
 from app.models.user import User
-from app.schemas.video import VideoCreate, VideoResponse, VideoCategoryCreate, VideoCategoryResponse
+from app.schemas.video import (
+    VideoCreate, VideoResponse, VideoCategoryCreate, VideoCategoryResponse,
+    VideoBulkUpdateItem, VideoBulkUpdateResponse
+)
+from app.schemas.progress import VideoProgressCreate, VideoProgressResponse
 from app.dependencies import get_current_user, require_teacher
+from app.recommendations import related_videos_index
+from app.trending import trending_ranking, record_view
+from app.teacher_stats import add_teacher_videos, record_teacher_student
+from app.cache import cached, response_cache, single_flight
+from app.conditional import versioned_by
+from app import serialization
+from app.config import settings
 
 router = APIRouter(prefix="/videos", tags=["Videos"])
 
@@ -20,10 +34,12 @@ async def create_category(
     category = VideoCategory(**category_data.dict())
     db.add(category)
     db.commit()
+    response_cache.invalidate("categories")
     db.refresh(category)
     return category
 
 @router.get("/categories", response_model=List[VideoCategoryResponse])
+@cached(List[VideoCategoryResponse], tags=("categories",))
 async def get_categories(db: Session = Depends(get_db)):
     """Barcha kategoriyalarni olish"""
     return db.query(VideoCategory).order_by(VideoCategory.order).all()
@@ -36,14 +52,21 @@ async def create_video(
     db: Session = Depends(get_db)
 ):
     """Video yaratish (Teacher+)"""
+    _check_teacher_exists(db, video_data.teacher_id)
     video = Video(**video_data.dict())
     db.add(video)
+    add_teacher_videos(db, video.teacher_id, 1)
     db.commit()
     db.refresh(video)
     return video
 
-@router.get("/", response_model=List[VideoResponse])
-async def get_videos(
+def _check_teacher_exists(db: Session, teacher_id: Optional[int]) -> None:
+    if teacher_id is not None and not db.query(Teacher.id).filter(Teacher.id == teacher_id).first():
+        raise HTTPException(status_code=404, detail="O'qituvchi topilmadi")
+
+@router.get("/", response_model=List[VideoResponse], dependencies=[versioned_by(Video, VideoCategory)])
+@single_flight(serialization.video_list)
+def get_videos(
     category_id: Optional[int] = Query(None),
     subject: Optional[str] = Query(None),
     search: Optional[str] = Query(None),
@@ -55,8 +78,10 @@ async def get_videos(
     - category_id: Kategoriya bo'yicha
     - subject: Mavzu bo'yicha
     - search: Qidiruv (title, description)
+
+    Bir vaqtda kelgan bir xil so'rovlar bitta so'rovga birlashadi.
     """
-    query = db.query(Video).filter(Video.is_published == True)
+    query = db.query(Video).options(selectinload(Video.category)).filter(Video.is_published == True)
 
     if category_id:
         query = query.filter(Video.category_id == category_id)
@@ -69,6 +94,114 @@ async def get_videos(
 
     return query.order_by(Video.order, Video.created_at.desc()).all()
 
+@router.patch("/bulk", response_model=VideoBulkUpdateResponse, dependencies=[Depends(require_teacher)])
+async def bulk_update_videos(
+    updates: List[VideoBulkUpdateItem],
+    db: Session = Depends(get_db)
+):
+    """
+    Videolarni ommaviy yangilash (Teacher+)
+
+    Playlist tartibini (order), nashr holatini va boshqa maydonlarni bitta
+    tranzaksiyada, bitta `UPDATE ... FROM (VALUES ...)` so'rovi bilan o'zgartiradi.
+    Berilmagan (null) maydonlar o'zgarmaydi.
+    """
+    if not updates:
+        raise HTTPException(status_code=400, detail="O'zgarishlar ro'yxati bo'sh")
+
+    video_ids = [item.id for item in updates]
+    if len(set(video_ids)) != len(video_ids):
+        raise HTTPException(status_code=400, detail="Video id lari takrorlanmasligi kerak")
+
+    delta = values(
+        column("id", Integer),
+        column("order", Integer),
+        column("is_published", Boolean),
+        column("category_id", Integer),
+        column("subject_id", Integer),
+        name="delta"
+    ).data([
+        (item.id, item.order, item.is_published, item.category_id, item.subject_id)
+        for item in updates
+    ])
+
+    stmt = update(Video).where(Video.id == delta.c.id).values(
+        order=func.coalesce(cast(delta.c.order, Integer), Video.order),
+        is_published=func.coalesce(cast(delta.c.is_published, Boolean), Video.is_published),
+        category_id=func.coalesce(cast(delta.c.category_id, Integer), Video.category_id),
+        subject_id=func.coalesce(cast(delta.c.subject_id, Integer), Video.subject_id),
+    ).returning(Video.id)
+
+    updated_ids = db.execute(stmt).scalars().all()
+
+    missing_ids = sorted(set(video_ids) - set(updated_ids))
+    if missing_ids:
+        db.rollback()
+        raise HTTPException(status_code=404, detail=f"Videolar topilmadi: {missing_ids}")
+
+    db.commit()
+
+    return {"message": "Videolar yangilandi", "updated_ids": sorted(updated_ids)}
+
+# ===== VIDEO PROGRESS =====
+
+@router.post("/progress", response_model=VideoProgressResponse)
+async def save_video_progress(
+    progress_data: VideoProgressCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Video progressini saqlash (yaratish yoki yangilash)
+
+    O'quvchining o'qituvchi videolaridagi birinchi progressida
+    o'qituvchining total_students hisoblagichi oshiriladi.
+    """
+    video = db.query(Video.id, Video.teacher_id).filter(Video.id == progress_data.video_id).first()
+    if not video:
+        raise HTTPException(status_code=404, detail="Video topilmadi")
+
+    progress = db.query(VideoProgress).filter(
+        VideoProgress.user_id == current_user.id,
+        VideoProgress.video_id == progress_data.video_id
+    ).first()
+
+    if progress is None:
+        progress = VideoProgress(user_id=current_user.id, **progress_data.dict())
+        db.add(progress)
+        db.flush()
+        record_teacher_student(db, video.teacher_id, current_user.id, progress.id)
+    else:
+        # Tugatilgan video qayta ko'rilganda ham tugatilgan bo'lib qoladi
+        completed = progress.completed or progress_data.completed
+        for key, value in progress_data.dict(exclude={"video_id"}).items():
+            setattr(progress, key, value)
+        progress.completed = completed
+
+    db.commit()
+    db.refresh(progress)
+    return progress
+
+@router.get("/trending", response_model=List[VideoResponse])
+async def get_trending_videos(
+    subject_id: Optional[int] = Query(None),
+    limit: int = Query(20, ge=1, le=settings.TRENDING_TOP_K),
+    db: Session = Depends(get_db)
+):
+    """
+    Trending videolar
+
+    Soatlik ko'rishlar asosida vaqt o'tishi bilan so'nuvchi reyting.
+    Reyting xotirada davriy yangilanadi, so'rov faqat video qatorlarini oladi.
+    """
+    trending_ids = trending_ranking.top(subject_id, limit)
+    if not trending_ids:
+        return []
+
+    videos = db.query(Video).filter(Video.id.in_(trending_ids), Video.is_published == True).all()
+    positions = {trending_id: i for i, trending_id in enumerate(trending_ids)}
+    return sorted(videos, key=lambda v: positions[v.id])
+
 @router.get("/{video_id}", response_model=VideoResponse)
 async def get_video(video_id: int, db: Session = Depends(get_db)):
     """Bitta videoni olish"""
@@ -76,12 +209,43 @@ async def get_video(video_id: int, db: Session = Depends(get_db)):
     if not video:
         raise HTTPException(status_code=404, detail="Video topilmadi")
 
-    # Views count oshirish
-    video.views_count += 1
+    # Views count oshirish: atomik, updated_at o'zgarmaydi (sync/katalog uchun kontent o'zgarishi emas)
+    db.execute(
+        update(Video).where(Video.id == video.id).values(
+            views_count=Video.views_count + 1,
+            updated_at=Video.updated_at
+        ),
+        execution_options={"synchronize_session": False, "counter_update": True}
+    )
+    record_view(db, video.id)
     db.commit()
 
     return video
 
+@router.get("/{video_id}/related", response_model=List[VideoResponse])
+async def get_related_videos(
+    video_id: int,
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    """
+    O'xshash videolar
+
+    Shu videoni ko'rganlar yana nimani ko'rgani (co-watch) va bir xil
+    fan/kategoriya asosida. Reyting xotiradagi indeksdan olinadi.
+    """
+    video = db.query(Video).filter(Video.id == video_id).first()
+    if not video:
+        raise HTTPException(status_code=404, detail="Video topilmadi")
+
+    related_ids = related_videos_index.related(video.id, video.subject_id, video.category_id, limit)
+    if not related_ids:
+        return []
+
+    videos = db.query(Video).filter(Video.id.in_(related_ids), Video.is_published == True).all()
+    positions = {related_id: i for i, related_id in enumerate(related_ids)}
+    return sorted(videos, key=lambda v: positions[v.id])
+
 @router.put("/{video_id}", response_model=VideoResponse, dependencies=[Depends(require_teacher)])
 async def update_video(
     video_id: int,
@@ -93,9 +257,15 @@ async def update_video(
     if not video:
         raise HTTPException(status_code=404, detail="Video topilmadi")
 
+    old_teacher_id = video.teacher_id
     for key, value in video_data.dict(exclude_unset=True).items():
         setattr(video, key, value)
 
+    if video.teacher_id != old_teacher_id:
+        _check_teacher_exists(db, video.teacher_id)
+        add_teacher_videos(db, old_teacher_id, -1)
+        add_teacher_videos(db, video.teacher_id, 1)
+
     db.commit()
     db.refresh(video)
     return video
@@ -108,5 +278,6 @@ async def delete_video(video_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Video topilmadi")
 
     db.delete(video)
+    add_teacher_videos(db, video.teacher_id, -1)
     db.commit()
     return {"message": "Video o'chirildi"}
@@ -0,0 +1,56 @@
+from pydantic import BaseModel
+from typing import Optional, List
+from app.schemas.video import VideoCategoryResponse
+
+class CatalogTest(BaseModel):
+    """Katalogdagi test (qisqa ma'lumot)"""
+    id: int
+    title: str
+    description: Optional[str] = None
+    category: Optional[str] = None
+    subject: Optional[str] = None
+    time_limit: int
+    passing_score: int
+    draw_count: Optional[int] = None
+    question_count: int
+
+class CatalogVideo(BaseModel):
+    """Katalogdagi video va unga bog'langan testlar"""
+    id: int
+    title: str
+    description: Optional[str] = None
+    video_url: str
+    thumbnail_url: Optional[str] = None
+    duration: Optional[int] = None
+    category_id: Optional[int] = None
+    order: int
+    tests: List[CatalogTest] = []
+
+class CatalogTeacher(BaseModel):
+    """Katalogdagi o'qituvchi va uning shu fandagi videolari"""
+    id: int
+    full_name: str
+    avatar_url: Optional[str] = None
+    experience_years: int
+    rating: float
+    rating_count: int
+    total_videos: int
+    total_students: int
+    videos: List[CatalogVideo] = []
+
+class CatalogSubject(BaseModel):
+    """Katalogdagi fan: o'qituvchilar -> videolar -> testlar"""
+    id: int
+    name: str
+    description: Optional[str] = None
+    icon_url: Optional[str] = None
+    order: int
+    teachers: List[CatalogTeacher] = []
+    videos: List[CatalogVideo] = []  # o'qituvchisi shu fanga biriktirilmagan videolar
+
+class CatalogSnapshot(BaseModel):
+    """To'liq nashr qilingan katalog (GET /catalog/snapshot)"""
+    categories: List[VideoCategoryResponse]
+    subjects: List[CatalogSubject]
+    videos: List[CatalogVideo]  # fanga bog'lanmagan videolar
+    tests: List[CatalogTest]  # videoga bog'lanmagan testlar
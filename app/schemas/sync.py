@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+from typing import List
+from datetime import datetime
+from app.schemas.teacher import SubjectResponse, TeacherResponse
+from app.schemas.test import TestSummaryResponse
+from app.schemas.video import VideoCategoryResponse, VideoResponse
+
+class SyncTombstone(BaseModel):
+    """O'chirilgan obyekt"""
+    entity: str  # video, test, subject, teacher, category
+    id: int
+    deleted_at: datetime
+
+class SyncResponse(BaseModel):
+    """Delta sync javobi (GET /sync)"""
+    cursor: str  # keyingi so'rovda ?since= ga beriladi
+    full: bool  # True - to'liq ro'yxat, client mahalliy nusxani almashtiradi
+    videos: List[VideoResponse]
+    tests: List[TestSummaryResponse]
+    subjects: List[SubjectResponse]
+    teachers: List[TeacherResponse]
+    categories: List[VideoCategoryResponse]
+    deleted: List[SyncTombstone]
@@ -27,6 +27,7 @@ class TeacherResponse(TeacherBase):
     id: int
     user_id: int
     rating: float
+    rating_count: int = 0
     total_students: int
     total_videos: int
     created_at: datetime
@@ -35,6 +36,11 @@ class TeacherResponse(TeacherBase):
     class Config:
         from_attributes = True
 
+class TeacherSubjectBadge(BaseModel):
+    """Teacher subject badge for lists"""
+    id: int
+    name: str
+
 class TeacherListItem(BaseModel):
     """Minimal teacher info for lists"""
     id: int
@@ -42,11 +48,27 @@ class TeacherListItem(BaseModel):
     avatar_url: Optional[str] = None
     experience_years: int
     rating: float
+    rating_count: int = 0
     total_videos: int
+    # Faqat include=subjects bilan; alias Teacher.subjects relationship ini o'qimaslik uchun
+    subjects: Optional[List[TeacherSubjectBadge]] = Field(None, validation_alias="subject_badges")
 
     class Config:
         from_attributes = True
 
+class TeacherRatingCreate(BaseModel):
+    """O'qituvchiga baho qo'yish"""
+    score: int = Field(..., ge=1, le=5)
+    comment: Optional[str] = Field(None, max_length=1000)
+
+class TeacherRatingResponse(BaseModel):
+    """Baho qo'yilgandan keyingi o'qituvchi reytingi"""
+    teacher_id: int
+    score: int  # foydalanuvchining bahosi
+    rating: float  # Bayes o'rtachasi
+    rating_count: int
+    rating_average: float  # oddiy o'rtacha
+
 # ============ Subject Schemas ============
 
 class SubjectBase(BaseModel):
@@ -93,4 +115,9 @@ class TeacherSubjectResponse(BaseModel):
     created_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class TeacherSubjectBulkResponse(BaseModel):
+    """Bulk biriktirish natijasi"""
+    created: List[TeacherSubjectResponse]
+    existing: List[TeacherSubjectCreate]  # avval biriktirilgan juftliklar
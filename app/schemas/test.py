@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Any, Literal
 from datetime import datetime
 
 class TestQuestionCreate(BaseModel):
@@ -10,6 +10,7 @@ class TestQuestionCreate(BaseModel):
     image_url: Optional[str] = None
     explanation: Optional[str] = None
     order: int = 0
+    weight: float = Field(default=1.0, gt=0)  # to'plamdan tanlanish og'irligi
 
 class TestQuestionResponse(BaseModel):
     """Test savol response"""
@@ -20,6 +21,7 @@ class TestQuestionResponse(BaseModel):
     image_url: Optional[str] = None
     explanation: Optional[str] = None
     order: int
+    weight: float = 1.0
 
     class Config:
         from_attributes = True
@@ -34,6 +36,7 @@ class TestCreate(BaseModel):
     time_limit: int = 600
     passing_score: int = 70
     is_published: bool = True
+    draw_count: Optional[int] = Field(default=None, ge=1)  # har urinishda nechta savol (None - hammasi)
     questions: List[TestQuestionCreate] = []
 
 class TestResponse(BaseModel):
@@ -47,17 +50,61 @@ class TestResponse(BaseModel):
     time_limit: int
     passing_score: int
     is_published: bool
+    draw_count: Optional[int] = None
     created_at: datetime
     questions: List[TestQuestionResponse] = []
 
     class Config:
         from_attributes = True
 
+class TestSummaryResponse(BaseModel):
+    """Test katalog uchun qisqa ma'lumot (savollar faqat ?include=questions bilan)"""
+    id: int
+    title: str
+    description: Optional[str] = None
+    video_id: Optional[int] = None
+    category: Optional[str] = None
+    subject: Optional[str] = None
+    time_limit: int
+    passing_score: int
+    is_published: bool
+    draw_count: Optional[int] = None
+    created_at: datetime
+    question_count: int
+    questions: Optional[List[TestQuestionResponse]] = None
+
+class TestQuestionDelivery(BaseModel):
+    """O'quvchiga beriladigan savol (to'g'ri javob va izohsiz)"""
+    id: int
+    question_text: str
+    options: List[str]
+    image_url: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class TestDeliveryResponse(BaseModel):
+    """O'quvchiga beriladigan test (barcha urinishlar uchun bir xil)"""
+    id: int
+    title: str
+    description: Optional[str] = None
+    time_limit: int
+    questions: List[TestQuestionDelivery]
+
+class TestAttemptResponse(BaseModel):
+    """Boshlangan urinish"""
+    attempt_id: str
+    started_at: datetime
+    expires_at: datetime
+    question_order: List[int]  # savollar ko'rsatiladigan tartib (test.questions indekslari)
+    test: TestDeliveryResponse
+
 class TestResultCreate(BaseModel):
     """Test natija yuborish"""
     test_id: int
     answers: List[int]  # foydalanuvchi javoblari [0, 2, 1, 3, ...]
     time_spent: Optional[int] = None
+    attempt_id: Optional[str] = None  # POST /tests/{id}/start dan; javoblar question_order tartibida
 
 class TestResultResponse(BaseModel):
     """Test natija response"""
@@ -73,3 +120,85 @@ class TestResultResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+class TestResultBatchItem(BaseModel):
+    """Offline rejimda yig'ilgan bitta test natijasi"""
+    client_attempt_id: str = Field(..., min_length=1, max_length=64)
+    test_id: int
+    answers: List[int]
+    time_spent: Optional[int] = None
+
+class TestResultBatchItemResponse(BaseModel):
+    """Batch dagi bitta natija holati"""
+    client_attempt_id: str
+    status: Literal["created", "duplicate", "error"]
+    result: Optional[TestResultResponse] = None
+    detail: Optional[str] = None
+
+class TestQuestionAnalytics(BaseModel):
+    """Bitta savol bo'yicha statistika"""
+    question_id: int
+    attempt_count: int
+    correct_count: int
+    correct_rate: float  # 0..1
+    option_counts: List[int]  # har bir variant necha marta tanlangan
+    unanswered_count: int
+
+class TestAnalyticsResponse(BaseModel):
+    """Test bo'yicha savollar statistikasi (Teacher+)"""
+    test_id: int
+    attempt_count: int
+    questions: List[TestQuestionAnalytics]
+
+class LeaderboardEntry(BaseModel):
+    """Reytingdagi bitta qator"""
+    rank: int
+    user_id: int
+    username: Optional[str] = None
+    full_name: Optional[str] = None
+    percentage: int
+    time_spent: Optional[int] = None
+
+class LeaderboardResponse(BaseModel):
+    """Test reytingi"""
+    test_id: int
+    total_participants: int
+    entries: List[LeaderboardEntry]
+    my_rank: Optional[int] = None
+
+class TestBestResult(BaseModel):
+    """Bitta test bo'yicha eng yaxshi natija"""
+    test_id: int
+    attempts: int
+    best_percentage: int
+    passed: bool
+
+class TestResultsSummary(BaseModel):
+    """Foydalanuvchi natijalari bo'yicha umumiy statistika"""
+    total_attempts: int
+    passed_attempts: int
+    pass_rate: float  # 0..1
+    average_percentage: float
+    best_per_test: List[TestBestResult]
+
+class TestResultsPage(BaseModel):
+    """Natijalar tarixi sahifasi"""
+    items: List[TestResultResponse]
+    next_cursor: Optional[str] = None
+    summary: Optional[TestResultsSummary] = None  # faqat birinchi sahifada
+
+class TestImportJobResponse(BaseModel):
+    """Testlarni import qilish jarayoni holati"""
+    job_id: str
+    status: Literal["pending", "running", "completed", "failed"]
+    format: str
+    processed_rows: int
+    created_tests: int
+    created_questions: int
+    error_count: int
+    errors: List[str]
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
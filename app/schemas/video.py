@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime
 
 class VideoCategoryCreate(BaseModel):
@@ -30,9 +30,23 @@ class VideoCreate(BaseModel):
     duration: Optional[int] = None
     category_id: Optional[int] = None
     subject: Optional[str] = None
+    teacher_id: Optional[int] = None
     is_published: bool = True
     order: int = 0
 
+class VideoBulkUpdateItem(BaseModel):
+    """Bulk yangilash: bitta video uchun o'zgarishlar (None - o'zgarmaydi)"""
+    id: int
+    order: Optional[int] = None
+    is_published: Optional[bool] = None
+    category_id: Optional[int] = None
+    subject_id: Optional[int] = None
+
+class VideoBulkUpdateResponse(BaseModel):
+    """Bulk yangilash natijasi"""
+    message: str
+    updated_ids: List[int]
+
 class VideoResponse(BaseModel):
     """Video response"""
     id: int
@@ -43,6 +57,7 @@ class VideoResponse(BaseModel):
     duration: Optional[int] = None
     category_id: Optional[int] = None
     subject: Optional[str] = None
+    teacher_id: Optional[int] = None
     is_published: bool
     order: int
     views_count: int
@@ -0,0 +1,24 @@
+from typing import Any, Dict, List, Optional
+from fastapi import Response
+from pydantic import TypeAdapter
+from app.schemas.test import TestSummaryResponse
+from app.schemas.user import UserResponse
+from app.schemas.video import VideoResponse
+
+# Oldindan kompilyatsiya qilingan adapterlar (validator/serializer bir marta quriladi)
+video_list = TypeAdapter(List[VideoResponse])
+test_summary_list = TypeAdapter(List[TestSummaryResponse])
+user_list = TypeAdapter(List[UserResponse])
+
+def dump_json(adapter: TypeAdapter, data: Any) -> bytes:
+    """
+    ORM obyektlari (yoki schema lar) -> JSON baytlar
+
+    FastAPI ning odatiy yo'li (jsonable_encoder -> dict/list -> json.dumps)
+    o'rniga pydantic-core to'g'ridan-to'g'ri baytlarga yozadi.
+    """
+    return adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+
+def json_response(adapter: TypeAdapter, data: Any, headers: Optional[Dict[str, str]] = None) -> Response:
+    """dump_json natijasini tayyor Response sifatida qaytarish"""
+    return Response(content=dump_json(adapter, data), media_type="application/json", headers=headers)
@@ -0,0 +1,135 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session, selectinload
+from app.background import periodic_job
+from app.config import settings
+from app.database import SessionLocal
+from app.models.subject import Subject
+from app.models.sync import Tombstone
+from app.models.teacher import Teacher
+from app.models.test import Test, TestQuestion
+from app.models.video import Video, VideoCategory
+from app.pagination import encode_cursor, decode_cursor, cursor_timestamp
+from app.schemas.sync import SyncResponse, SyncTombstone
+from app.schemas.test import TestSummaryResponse
+
+# Sync qilinadigan modellar: model -> tombstone dagi nom
+SYNC_ENTITIES = {
+    Video: "video",
+    Test: "test",
+    Subject: "subject",
+    Teacher: "teacher",
+    VideoCategory: "category",
+}
+
+@event.listens_for(SessionLocal, "before_flush")
+def _record_tombstones(session: Session, flush_context, instances) -> None:
+    """O'chirilayotgan obyektlar uchun shu tranzaksiyada tombstone yozish"""
+    for instance in session.deleted:
+        entity = SYNC_ENTITIES.get(type(instance))
+        if entity is not None and instance.id is not None:
+            session.add(Tombstone(entity=entity, entity_id=instance.id))
+
+def _changed_since(query, column, since: Optional[datetime]):
+    if since is None:
+        return query
+    if not column.type.timezone:
+        # subjects/teachers da updated_at - timezone siz UTC
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    return query.filter(column >= since)
+
+def collect_changes(db: Session, cursor: Optional[str]) -> SyncResponse:
+    """
+    Cursor dan keyin yaratilgan/o'zgargan/o'chirilgan obyektlar
+
+    Cursor - oldingi sync boshlangan vaqt. So'rov `cursor - SYNC_OVERLAP_SECONDS`
+    dan boshlanadi: uzoq tranzaksiya commit dan oldingi updated_at bilan
+    yozilgan bo'lsa ham o'tkazib yuborilmaydi (client id bo'yicha upsert qiladi).
+    Cursor juda eski bo'lsa (tombstone lar tozalangan) to'liq sync qaytadi.
+    Nashr qilinmagan video/testlar qaytarilmaydi: delta da nashrdan
+    olinganlari `deleted` ga tushadi.
+    """
+    now = datetime.now(timezone.utc)
+    since = None
+    if cursor:
+        (cursor_time,) = decode_cursor(cursor, cursor_timestamp)
+        overlap = timedelta(seconds=settings.SYNC_OVERLAP_SECONDS)
+        # Taqqoslash ayirishdan oldin - datetime.min ga yaqin cursor overflow bermasin
+        if cursor_time >= now - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS) + overlap:
+            since = cursor_time - overlap
+
+    videos = _changed_since(
+        db.query(Video).options(selectinload(Video.category)), Video.updated_at, since
+    )
+    tests = _changed_since(db.query(Test), Test.updated_at, since)
+    if since is None:
+        # To'liq sync - faqat nashr qilinganlar (GET /videos, GET /tests kabi)
+        videos = videos.filter(Video.is_published == True)
+        tests = tests.filter(Test.is_published == True)
+    videos = videos.order_by(Video.updated_at, Video.id).all()
+    tests = tests.order_by(Test.updated_at, Test.id).all()
+
+    # Delta da nashrdan olinganlar client dan o'chirilishi kerak - tombstone sifatida
+    unpublished = [
+        SyncTombstone(entity=SYNC_ENTITIES[type(item)], id=item.id, deleted_at=item.updated_at)
+        for item in (*videos, *tests) if not item.is_published
+    ]
+    videos = [video for video in videos if video.is_published]
+    tests = [test for test in tests if test.is_published]
+    subjects = _changed_since(db.query(Subject), Subject.updated_at, since).order_by(
+        Subject.updated_at, Subject.id
+    ).all()
+    teachers = _changed_since(db.query(Teacher), Teacher.updated_at, since).order_by(
+        Teacher.updated_at, Teacher.id
+    ).all()
+    categories = _changed_since(db.query(VideoCategory), VideoCategory.updated_at, since).order_by(
+        VideoCategory.updated_at, VideoCategory.id
+    ).all()
+    deleted = _changed_since(db.query(Tombstone), Tombstone.deleted_at, since).order_by(
+        Tombstone.deleted_at, Tombstone.id
+    ).all() if since is not None else []
+
+    question_counts = dict(db.query(TestQuestion.test_id, func.count(TestQuestion.id)).filter(
+        TestQuestion.test_id.in_([test.id for test in tests])
+    ).group_by(TestQuestion.test_id).all()) if tests else {}
+
+    return SyncResponse(
+        cursor=encode_cursor(now.isoformat()),
+        full=since is None,
+        videos=videos,
+        tests=[
+            TestSummaryResponse(
+                id=test.id,
+                title=test.title,
+                description=test.description,
+                video_id=test.video_id,
+                category=test.category,
+                subject=test.subject,
+                time_limit=test.time_limit,
+                passing_score=test.passing_score,
+                is_published=test.is_published,
+                draw_count=test.draw_count,
+                created_at=test.created_at,
+                question_count=question_counts.get(test.id, 0)
+            )
+            for test in tests
+        ],
+        subjects=subjects,
+        teachers=teachers,
+        categories=categories,
+        deleted=sorted([
+            *(
+                SyncTombstone(entity=tombstone.entity, id=tombstone.entity_id, deleted_at=tombstone.deleted_at)
+                for tombstone in deleted
+            ),
+            *unpublished,
+        ], key=lambda tombstone: tombstone.deleted_at)
+    )
+
+@periodic_job(24 * 3600, name="sync_tombstones_purge")
+def purge_tombstones(db: Session) -> None:
+    """Saqlash muddati o'tgan tombstone larni o'chirish"""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+    db.query(Tombstone).filter(Tombstone.deleted_at < cutoff).delete(synchronize_session=False)
+    db.commit()
@@ -0,0 +1,86 @@
+from collections import defaultdict
+from typing import List, Optional
+from fastapi import Response
+from sqlalchemy import exists, func, literal_column, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import Session
+from app.models.subject import Subject, TeacherSubject
+from app.models.teacher import Teacher
+from app.pagination import encode_cursor, decode_cursor
+from app.schemas.teacher import TeacherListItem, TeacherSubjectBadge
+
+def _subjects_json():
+    """Postgres: o'qituvchi fanlari json_agg bilan (korrelyatsiyalangan subquery)"""
+    badge = func.json_build_object("id", Subject.id, "name", Subject.name)
+    return select(
+        func.coalesce(
+            func.json_agg(aggregate_order_by(badge, Subject.order, Subject.id)),
+            literal_column("'[]'::json")
+        )
+    ).select_from(TeacherSubject).join(Subject, Subject.id == TeacherSubject.subject_id).where(
+        TeacherSubject.teacher_id == Teacher.id
+    ).correlate(Teacher).scalar_subquery()
+
+def _load_subjects(db: Session, teacher_ids: List[int]) -> dict:
+    """Boshqa bazalar: sahifadagi o'qituvchilar fanlari bitta guruhlangan so'rovda"""
+    rows = db.query(TeacherSubject.teacher_id, Subject.id, Subject.name).join(
+        Subject, Subject.id == TeacherSubject.subject_id
+    ).filter(TeacherSubject.teacher_id.in_(teacher_ids)).order_by(
+        TeacherSubject.teacher_id, Subject.order, Subject.id
+    ).all() if teacher_ids else []
+
+    grouped = defaultdict(list)
+    for teacher_id, subject_id, name in rows:
+        grouped[teacher_id].append({"id": subject_id, "name": name})
+    return grouped
+
+def list_teachers(
+    db: Session,
+    response: Response,
+    subject_id: Optional[int],
+    limit: int,
+    cursor: Optional[str],
+    include_subjects: bool
+) -> List[TeacherListItem]:
+    """
+    O'qituvchilar ro'yxati: reyting bo'yicha, keyset pagination bilan
+
+    Tartib (rating DESC, id) - ix_teachers_rating indeksi bilan mos.
+    Keyingi sahifa cursor i X-Next-Cursor header ida qaytariladi.
+    include_subjects=True bo'lsa har bir o'qituvchining fanlari ham
+    qo'shiladi (Postgres da shu so'rovning o'zida).
+    """
+    embed_in_query = include_subjects and db.get_bind().dialect.name == "postgresql"
+    columns = [Teacher, _subjects_json()] if embed_in_query else [Teacher]
+    query = db.query(*columns)
+
+    if subject_id:
+        query = query.filter(exists().where(
+            TeacherSubject.teacher_id == Teacher.id,
+            TeacherSubject.subject_id == subject_id
+        ))
+    if cursor:
+        last_rating, last_id = decode_cursor(cursor, float, int)
+        query = query.filter(
+            (Teacher.rating < last_rating) | ((Teacher.rating == last_rating) & (Teacher.id > last_id))
+        )
+
+    rows = query.order_by(Teacher.rating.desc(), Teacher.id).limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1][0] if embed_in_query else rows[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.rating, last.id)
+
+    if embed_in_query:
+        teachers, subjects = [row[0] for row in rows], {row[0].id: row[1] for row in rows}
+    else:
+        teachers = rows
+        subjects = _load_subjects(db, [teacher.id for teacher in teachers]) if include_subjects else {}
+
+    items = []
+    for teacher in teachers:
+        item = TeacherListItem.model_validate(teacher)
+        if include_subjects:
+            item.subjects = [TeacherSubjectBadge(**badge) for badge in subjects.get(teacher.id, [])]
+        items.append(item)
+    return items
@@ -0,0 +1,150 @@
+from typing import Optional
+from sqlalchemy import case, exists, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from app.background import periodic_job
+from app.config import settings
+from app.models.progress import VideoProgress
+from app.models.teacher import Teacher, TeacherRating
+from app.models.video import Video
+
+# Teacher.total_videos / total_students / reyting hisoblagichlari o'zgarish paytida
+# atomik UPDATE (col = col + delta) bilan yuritiladi, shuning uchun ro'yxat
+# sahifalarida COUNT join kerak emas. Commit chaqiruvchi tomonidan qilinadi.
+
+def add_teacher_videos(db: Session, teacher_id: Optional[int], delta: int) -> None:
+    """O'qituvchi videolari sonini o'zgartirish (video yaratish/o'chirish)"""
+    if teacher_id is None or delta == 0:
+        return
+    db.execute(
+        update(Teacher).where(Teacher.id == teacher_id).values(
+            total_videos=func.coalesce(Teacher.total_videos, 0) + delta
+        )
+    )
+
+def record_teacher_student(db: Session, teacher_id: Optional[int], user_id: int, progress_id: int) -> None:
+    """
+    O'quvchining shu o'qituvchi videolaridagi birinchi progressida total_students ni oshirish
+
+    Tekshiruv va oshirish bitta UPDATE ... WHERE NOT EXISTS statement ida.
+    """
+    if teacher_id is None:
+        return
+    earlier_progress = exists().where(
+        VideoProgress.user_id == user_id,
+        VideoProgress.id != progress_id,
+        VideoProgress.video_id == Video.id,
+        Video.teacher_id == teacher_id
+    )
+    db.execute(
+        update(Teacher).where(Teacher.id == teacher_id, ~earlier_progress).values(
+            total_students=func.coalesce(Teacher.total_students, 0) + 1
+        )
+    )
+
+def bayesian_rating(rating_sum, rating_count):
+    """
+    Bayes o'rtachasi: (C * m + sum) / (C + count)
+
+    Kam baho olgan o'qituvchi prior (m) ga yaqin turadi, shuning uchun
+    bitta 5 ball ko'p bahoga ega o'qituvchidan yuqori chiqmaydi.
+    Baho yo'q bo'lsa 0 (SQL ifodasi).
+    """
+    prior_weight = settings.TEACHER_RATING_PRIOR_WEIGHT
+    score = (prior_weight * settings.TEACHER_RATING_PRIOR_MEAN + rating_sum) / (prior_weight + rating_count)
+    return case((rating_count == 0, 0.0), else_=score)
+
+def rate_teacher(db: Session, teacher_id: int, user_id: int, score: int, comment: Optional[str]) -> Row:
+    """
+    Baho qo'yish (yoki avvalgisini o'zgartirish) va agregatni yangilash
+
+    Bitta statement: eski baho CTE, INSERT ... ON CONFLICT DO UPDATE CTE va
+    teachers ni rating_sum/rating_count/rating bo'yicha O(1) UPDATE.
+    Qaytaradi: (rating, rating_count, rating_sum).
+    """
+    old = select(TeacherRating.score).where(
+        TeacherRating.teacher_id == teacher_id,
+        TeacherRating.user_id == user_id
+    ).cte("old_rating")
+
+    stmt = insert(TeacherRating).values(teacher_id=teacher_id, user_id=user_id, score=score, comment=comment)
+    upsert = stmt.on_conflict_do_update(
+        index_elements=[TeacherRating.teacher_id, TeacherRating.user_id],
+        set_={"score": stmt.excluded.score, "comment": stmt.excluded.comment, "updated_at": func.now()}
+    ).returning(TeacherRating.teacher_id, TeacherRating.score).cte("new_rating")
+
+    rating_sum = Teacher.rating_sum + upsert.c.score - func.coalesce(select(old.c.score).scalar_subquery(), 0)
+    rating_count = Teacher.rating_count + case((exists(select(old.c.score)), 0), else_=1)
+
+    return db.execute(
+        update(Teacher).where(Teacher.id == upsert.c.teacher_id).values(
+            rating_sum=rating_sum,
+            rating_count=rating_count,
+            rating=bayesian_rating(rating_sum, rating_count)
+        ).returning(Teacher.rating, Teacher.rating_count, Teacher.rating_sum).execution_options(
+            synchronize_session=False
+        )
+    ).one()
+
+def reconcile_teacher_stats(db: Session) -> int:
+    """
+    Hisoblagichlarni bitta set-based UPDATE bilan qayta hisoblash
+
+    Faqat haqiqiy qiymatdan farq qiladigan qatorlar yoziladi.
+    Qaytaradi: tuzatilgan o'qituvchilar soni.
+    """
+    video_counts = select(
+        Video.teacher_id.label("teacher_id"),
+        func.count().label("total")
+    ).where(Video.teacher_id.isnot(None)).group_by(Video.teacher_id).subquery()
+
+    student_counts = select(
+        Video.teacher_id.label("teacher_id"),
+        func.count(func.distinct(VideoProgress.user_id)).label("total")
+    ).join(Video, Video.id == VideoProgress.video_id).where(
+        Video.teacher_id.isnot(None)
+    ).group_by(Video.teacher_id).subquery()
+
+    ratings = select(
+        TeacherRating.teacher_id.label("teacher_id"),
+        func.sum(TeacherRating.score).label("total"),
+        func.count().label("count")
+    ).group_by(TeacherRating.teacher_id).subquery()
+
+    rating_sum = func.coalesce(ratings.c.total, 0)
+    rating_count = func.coalesce(ratings.c.count, 0)
+    actual = select(
+        Teacher.id.label("teacher_id"),
+        func.coalesce(video_counts.c.total, 0).label("total_videos"),
+        func.coalesce(student_counts.c.total, 0).label("total_students"),
+        rating_sum.label("rating_sum"),
+        rating_count.label("rating_count"),
+        bayesian_rating(rating_sum, rating_count).label("rating")
+    ).outerjoin(video_counts, video_counts.c.teacher_id == Teacher.id).outerjoin(
+        student_counts, student_counts.c.teacher_id == Teacher.id
+    ).outerjoin(ratings, ratings.c.teacher_id == Teacher.id).subquery()
+
+    result = db.execute(
+        update(Teacher).where(
+            Teacher.id == actual.c.teacher_id,
+            (Teacher.total_videos.is_distinct_from(actual.c.total_videos))
+            | (Teacher.total_students.is_distinct_from(actual.c.total_students))
+            | (Teacher.rating_sum != actual.c.rating_sum)
+            | (Teacher.rating_count != actual.c.rating_count)
+            | (Teacher.rating.is_distinct_from(actual.c.rating))
+        ).values(
+            total_videos=actual.c.total_videos,
+            total_students=actual.c.total_students,
+            rating_sum=actual.c.rating_sum,
+            rating_count=actual.c.rating_count,
+            rating=actual.c.rating
+        ).execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+@periodic_job(settings.TEACHER_STATS_RECONCILE_SECONDS, name="teacher_stats_reconcile")
+def reconcile_teacher_stats_job(db: Session) -> None:
+    """O'qituvchi hisoblagichlaridagi og'ishlarni davriy tuzatish"""
+    reconcile_teacher_stats(db)
@@ -0,0 +1,249 @@
+import csv
+import io
+import json
+import secrets
+import time
+from datetime import datetime, timezone
+from typing import IO, Iterator, List, Optional, Tuple
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.cache import cache_backend
+from app.cache_backends import CacheBackend, MemoryBackend
+from app.database import SessionLocal
+from app.models.test import Test, TestQuestion
+from app.schemas.test import TestCreate
+
+# Bitta INSERT dagi maksimal qatorlar
+QUESTION_CHUNK_SIZE = 1000
+TEST_CHUNK_SIZE = 200
+MAX_REPORTED_ERRORS = 50
+
+# Jarayon holati omborda shuncha saqlanadi; fon vazifasi uni shu oraliqda yangilaydi
+IMPORT_JOB_TTL_SECONDS = 24 * 3600
+PROGRESS_SAVE_SECONDS = 1.0
+
+# CSV ustunlari: test maydonlari "test_" prefiksi bilan, qolganlari savol maydonlari.
+# Ketma-ket kelgan bir xil test_title li qatorlar bitta testga tegishli.
+CSV_TEST_FIELDS = (
+    "title", "description", "video_id", "category", "subject",
+    "time_limit", "passing_score", "is_published", "draw_count",
+)
+CSV_OPTIONS_SEPARATOR = "|"
+
+class ImportJob:
+    """Testlarni import qilish jarayoni holati"""
+
+    def __init__(self, user_id: int, file_format: str):
+        self.job_id = secrets.token_urlsafe(12)
+        self.user_id = user_id
+        self.format = file_format
+        self.status = "pending"  # pending, running, completed, failed
+        self.processed_rows = 0
+        self.created_tests = 0
+        self.created_questions = 0
+        self.errors: List[str] = []
+        self.error_count = 0
+        self.started_at = datetime.now(timezone.utc)
+        self.finished_at: Optional[datetime] = None
+
+    def add_error(self, row: int, message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"{row}-qator: {message}")
+
+    def to_bytes(self) -> bytes:
+        return json.dumps({
+            "user_id": self.user_id,
+            "format": self.format,
+            "status": self.status,
+            "processed_rows": self.processed_rows,
+            "created_tests": self.created_tests,
+            "created_questions": self.created_questions,
+            "errors": self.errors,
+            "error_count": self.error_count,
+            "started_at": self.started_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }).encode()
+
+    @classmethod
+    def from_bytes(cls, job_id: str, data: bytes) -> "ImportJob":
+        state = json.loads(data)
+        job = cls(state.pop("user_id"), state.pop("format"))
+        job.job_id = job_id
+        job.started_at = datetime.fromisoformat(state.pop("started_at"))
+        finished_at = state.pop("finished_at")
+        job.finished_at = datetime.fromisoformat(finished_at) if finished_at else None
+        for name, value in state.items():
+            setattr(job, name, value)
+        return job
+
+class ImportJobRegistry:
+    """
+    Import jarayonlari holati (TTL bilan)
+
+    Umumiy kesh ombori (Redis) bo'lsa holat boshqa worker ga kelgan
+    GET /tests/import/{job_id} da ham ko'rinadi; process ichidagi omborda
+    faqat import ni boshlagan worker da.
+    """
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+
+    def create(self, user_id: int, file_format: str) -> ImportJob:
+        job = ImportJob(user_id, file_format)
+        self.save(job)
+        return job
+
+    def save(self, job: ImportJob) -> None:
+        """Joriy holatni omborga yozish"""
+        self.backend.set(f"import_job:{job.job_id}", job.to_bytes(), IMPORT_JOB_TTL_SECONDS)
+
+    def get(self, job_id: str) -> Optional[ImportJob]:
+        data = self.backend.get(f"import_job:{job_id}")
+        return ImportJob.from_bytes(job_id, data) if data is not None else None
+
+# Process ichidagi ombor bo'lsa - alohida, oxirgi 100 ta jarayon
+import_jobs = ImportJobRegistry(cache_backend if cache_backend.shared else MemoryBackend(max_entries=100))
+
+def detect_format(filename: str) -> Optional[str]:
+    """Fayl kengaytmasidan format: csv, json yoki jsonl"""
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    if name.endswith(".json"):
+        return "json"
+    return None
+
+def _iter_json(stream: IO[bytes]) -> Iterator[Tuple[int, dict]]:
+    data = json.load(stream)
+    if not isinstance(data, list):
+        raise ValueError("JSON fayl testlar ro'yxati bo'lishi kerak")
+    for index, item in enumerate(data, start=1):
+        yield index, item
+
+def _iter_jsonl(stream: IO[bytes]) -> Iterator[Tuple[int, dict]]:
+    for line_number, line in enumerate(io.TextIOWrapper(stream, encoding="utf-8-sig"), start=1):
+        if line.strip():
+            yield line_number, json.loads(line)
+
+def _iter_csv(stream: IO[bytes], job: ImportJob) -> Iterator[Tuple[int, dict]]:
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+    current, current_row = None, 0
+    for row_number, row in enumerate(reader, start=2):  # 1-qator - sarlavha
+        row = {key: value for key, value in row.items() if key and value not in (None, "")}
+        title = row.get("test_title")
+        if current is not None and title != current.get("title"):
+            yield current_row, current
+            current = None
+
+        if current is None:
+            current = {field: row[f"test_{field}"] for field in CSV_TEST_FIELDS if f"test_{field}" in row}
+            current["questions"] = []
+            current_row = row_number
+
+        if "question_text" in row:
+            question = {
+                key: row[key]
+                for key in ("question_text", "correct_answer", "image_url", "explanation", "order", "weight")
+                if key in row
+            }
+            question["options"] = row.get("options", "").split(CSV_OPTIONS_SEPARATOR)
+            current["questions"].append(question)
+        job.processed_rows = row_number - 1
+
+    if current is not None:
+        yield current_row, current
+
+def _flush(db: Session, tests: List[TestCreate], job: ImportJob) -> None:
+    """Testlarni bitta INSERT, savollarni chunk lab INSERT qilish"""
+    if not tests:
+        return
+
+    test_ids = db.scalars(
+        insert(Test).returning(Test.id, sort_by_parameter_order=True),
+        [test.model_dump(exclude={"questions"}) for test in tests]
+    ).all()
+
+    questions = []
+    for test_id, test in zip(test_ids, tests):
+        for question in test.questions:
+            questions.append({"test_id": test_id, **question.model_dump()})
+            if len(questions) >= QUESTION_CHUNK_SIZE:
+                db.execute(insert(TestQuestion), questions)
+                job.created_questions += len(questions)
+                questions = []
+    if questions:
+        db.execute(insert(TestQuestion), questions)
+        job.created_questions += len(questions)
+
+    job.created_tests += len(tests)
+    tests.clear()
+
+def run_import(job: ImportJob, stream: IO[bytes]) -> None:
+    """
+    Import ni bajarish (fon vazifasi)
+
+    Hammasi bitta tranzaksiyada: birorta xato bo'lsa hech narsa saqlanmaydi.
+    """
+    job.status = "running"
+    import_jobs.save(job)
+    saved_at = time.monotonic()
+    db = SessionLocal()
+    try:
+        if job.format == "csv":
+            items = _iter_csv(stream, job)
+        elif job.format == "jsonl":
+            items = _iter_jsonl(stream)
+        else:
+            items = _iter_json(stream)
+
+        pending: List[TestCreate] = []
+        pending_questions = 0
+        for row_number, item in items:
+            if job.format != "csv":
+                job.processed_rows = row_number
+            if time.monotonic() - saved_at >= PROGRESS_SAVE_SECONDS:
+                # Jarayon boshqa worker larda ham ko'rinishi uchun
+                import_jobs.save(job)
+                saved_at = time.monotonic()
+            try:
+                test = TestCreate.model_validate(item)
+            except ValidationError as e:
+                for error in e.errors():
+                    location = ".".join(str(part) for part in error["loc"])
+                    job.add_error(row_number, f"{location}: {error['msg']}")
+                continue
+
+            if job.error_count:
+                # Xato topilgandan keyin faqat validatsiya davom etadi
+                continue
+
+            pending.append(test)
+            pending_questions += len(test.questions)
+            if len(pending) >= TEST_CHUNK_SIZE or pending_questions >= QUESTION_CHUNK_SIZE:
+                _flush(db, pending, job)
+                pending_questions = 0
+
+        if job.error_count:
+            db.rollback()
+            job.created_tests = job.created_questions = 0
+            job.status = "failed"
+            return
+
+        _flush(db, pending, job)
+        db.commit()
+        job.status = "completed"
+    except Exception as e:
+        db.rollback()
+        job.created_tests = job.created_questions = 0
+        job.error_count += 1
+        job.errors.append(f"Faylni o'qib bo'lmadi: {e}")
+        job.status = "failed"
+    finally:
+        job.finished_at = datetime.now(timezone.utc)
+        import_jobs.save(job)
+        db.close()
+        stream.close()
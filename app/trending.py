@@ -0,0 +1,94 @@
+import heapq
+import math
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from sqlalchemy import extract, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.background import periodic_job
+from app.config import settings
+from app.models.video import Video, VideoViewBucket
+
+def current_bucket(now: Optional[datetime] = None) -> datetime:
+    """Joriy soatlik bucket boshlanishi (UTC)"""
+    now = now or datetime.now(timezone.utc)
+    return now.replace(minute=0, second=0, microsecond=0)
+
+def record_view(db: Session, video_id: int) -> None:
+    """
+    Ko'rishni joriy soatlik bucket ga yozish
+
+    Commit chaqiruvchi tomonidan qilinadi.
+    """
+    stmt = insert(VideoViewBucket).values(
+        video_id=video_id,
+        bucket_start=current_bucket(),
+        views=1
+    ).on_conflict_do_update(
+        index_elements=[VideoViewBucket.video_id, VideoViewBucket.bucket_start],
+        set_={"views": VideoViewBucket.views + 1}
+    )
+    db.execute(stmt)
+
+class TrendingRanking:
+    """
+    Vaqt o'tishi bilan so'nuvchi (exponential decay) trending reyting
+
+    score = sum(views * 2^(-yosh_soat / half_life)) oxirgi oyna ichidagi
+    bucket lar bo'yicha. Top-K ro'yxatlar (umumiy va har bir fan uchun)
+    davriy ravishda qayta hisoblanadi va xotiradan beriladi.
+    """
+
+    def __init__(self, top_k: int):
+        self.top_k = top_k
+        self._top: List[int] = []
+        self._top_by_subject: Dict[int, List[int]] = {}
+
+    def refresh(self, db: Session) -> None:
+        """Top-K ro'yxatlarni qayta hisoblash"""
+        now = datetime.now(timezone.utc)
+        window_start = now - timedelta(hours=settings.TRENDING_WINDOW_HOURS)
+
+        # Oynadan tashqaridagi eski bucket lar endi kerak emas
+        db.query(VideoViewBucket).filter(
+            VideoViewBucket.bucket_start < window_start
+        ).delete(synchronize_session=False)
+        db.commit()
+
+        decay = math.log(2) / settings.TRENDING_HALF_LIFE_HOURS
+        age_hours = extract("epoch", now - VideoViewBucket.bucket_start) / 3600.0
+        score = func.sum(VideoViewBucket.views * func.exp(-decay * age_hours))
+
+        rows = db.query(VideoViewBucket.video_id, Video.subject_id, score).join(
+            Video, Video.id == VideoViewBucket.video_id
+        ).filter(
+            Video.is_published == True,
+            VideoViewBucket.bucket_start >= window_start
+        ).group_by(VideoViewBucket.video_id, Video.subject_id).all()
+
+        by_subject = defaultdict(list)
+        for video_id, subject_id, video_score in rows:
+            if subject_id is not None:
+                by_subject[subject_id].append((video_score, video_id))
+
+        self._top = [video_id for _, video_id in heapq.nlargest(
+            self.top_k, ((video_score, video_id) for video_id, _, video_score in rows)
+        )]
+        self._top_by_subject = {
+            subject_id: [video_id for _, video_id in heapq.nlargest(self.top_k, scored)]
+            for subject_id, scored in by_subject.items()
+        }
+
+    def top(self, subject_id: Optional[int], limit: int) -> List[int]:
+        """Trending video id lari (eng yuqori score birinchi)"""
+        if subject_id is None:
+            return self._top[:limit]
+        return self._top_by_subject.get(subject_id, [])[:limit]
+
+trending_ranking = TrendingRanking(top_k=settings.TRENDING_TOP_K)
+
+@periodic_job(settings.TRENDING_REFRESH_SECONDS, name="trending_videos")
+def refresh_trending(db: Session) -> None:
+    """Trending reytingni davriy yangilash"""
+    trending_ranking.refresh(db)
@@ -0,0 +1,75 @@
+"""
+Test natijalari javoblarini saqlash formatlari benchmarki
+
+Vaqtinchalik ikki jadval yaratiladi - javoblar JSON da va ixcham BYTEA da -
+bir xil tasodifiy natijalar bilan to'ldiriladi, so'ng jadval hajmi
+(TOAST va indekslar bilan) va barcha javoblarni o'qib decode qilish
+(analitika uchun to'liq scan) tezligi o'lchanadi.
+
+Ishlatish:
+    python benchmarks/answers_storage.py [--rows 200000] [--questions 30] [--options 4]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text  # noqa: E402
+from app.answer_codec import pack_answers, unpack_answers  # noqa: E402
+from app.database import engine  # noqa: E402
+
+INSERT_CHUNK = 5000
+
+def _measure_scan(conn, table: str, decode) -> float:
+    started = time.perf_counter()
+    total = 0
+    result = conn.execution_options(stream_results=True, yield_per=INSERT_CHUNK).execute(
+        text(f"SELECT answers FROM {table}")
+    )
+    for (answers,) in result:
+        total += len(decode(answers))
+    return time.perf_counter() - started
+
+def main(rows: int, questions: int, options: int) -> None:
+    rng = random.Random(42)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TEMP TABLE bench_answers_json (id SERIAL PRIMARY KEY, answers JSON)"))
+        conn.execute(text("CREATE TEMP TABLE bench_answers_packed (id SERIAL PRIMARY KEY, answers BYTEA)"))
+
+        for start in range(0, rows, INSERT_CHUNK):
+            batch = [
+                [rng.randrange(-1, options) for _ in range(questions)]
+                for _ in range(min(INSERT_CHUNK, rows - start))
+            ]
+            conn.execute(
+                text("INSERT INTO bench_answers_json (answers) VALUES (CAST(:answers AS JSON))"),
+                [{"answers": str(answers)} for answers in batch]
+            )
+            conn.execute(
+                text("INSERT INTO bench_answers_packed (answers) VALUES (:answers)"),
+                [{"answers": pack_answers(answers)} for answers in batch]
+            )
+        conn.execute(text("ANALYZE bench_answers_json"))
+        conn.execute(text("ANALYZE bench_answers_packed"))
+
+        print(f"{rows} natija x {questions} savol ({options} variant)\n")
+        print(f"{'format':<8} {'hajm':>12} {'scan+decode':>14}")
+        for label, table, decode in (
+            ("json", "bench_answers_json", lambda answers: answers),
+            ("packed", "bench_answers_packed", lambda answers: unpack_answers(bytes(answers))),
+        ):
+            size = conn.execute(text(f"SELECT pg_total_relation_size('{table}')")).scalar()
+            elapsed = _measure_scan(conn, table, decode)
+            print(f"{label:<8} {size / 1024 / 1024:>9.1f} MB {elapsed:>12.2f} s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--questions", type=int, default=30)
+    parser.add_argument("--options", type=int, default=4)
+    args = parser.parse_args()
+    main(args.rows, args.questions, args.options)
@@ -0,0 +1,116 @@
+"""
+Ro'yxat javoblarini serializatsiya qilish benchmarki
+
+Bazasiz: xotirada ORM obyektlari (Video, Test, User) yaratiladi va har bir
+yo'l bilan JSON baytlarga o'giriladi:
+
+- fastapi+json   - FastAPI ning odatiy yo'li (serialize_response -> JSONResponse)
+- fastapi+orjson - xuddi shu, ORJSONResponse bilan (ilovaning default i)
+- typeadapter    - app.serialization: TypeAdapter.dump_json, oraliq dict larsiz
+
+Natija - 1000 qator uchun millisekund (bir nechta takrorning eng yaxshisi).
+
+Ishlatish:
+    python benchmarks/serialization.py [--rows 1000] [--repeat 20]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse, ORJSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_model_field  # noqa: E402
+from app import serialization  # noqa: E402
+from app.models import User, Video  # noqa: E402
+from app.models.enums import UserRole  # noqa: E402
+from app.models.oauth import OAuthAccount  # noqa: E402,F401  (relationship lar uchun mapper lar)
+from app.models.subject import Subject  # noqa: E402,F401
+from app.schemas.test import TestSummaryResponse  # noqa: E402
+
+# Uzun o'zbekcha/ruscha matnlar (haqiqiy tavsiflarga o'xshash)
+WORDS = (
+    "matematika tenglama funksiya hosila integral o'quvchi mashq yechim misol dars "
+    "математика уравнение функция производная интеграл ученик упражнение решение пример урок"
+).split()
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+def build_rows(count: int):
+    rng = random.Random(42)
+    now = datetime.now(timezone.utc)
+    videos = [
+        Video(
+            id=i, title=_text(rng, 6), description=_text(rng, 60),
+            video_url=f"https://cdn.example.com/videos/{i}.mp4", thumbnail_url=f"https://cdn.example.com/thumbs/{i}.jpg",
+            duration=rng.randint(60, 3600), category_id=rng.randint(1, 20), teacher_id=rng.randint(1, 50),
+            is_published=True, order=i, views_count=rng.randint(0, 100000), created_at=now - timedelta(minutes=i)
+        )
+        for i in range(1, count + 1)
+    ]
+    tests = [
+        TestSummaryResponse(
+            id=i, title=_text(rng, 6), description=_text(rng, 40), video_id=i, category="algebra",
+            subject="matematika", time_limit=1800, passing_score=60, is_published=True,
+            created_at=now - timedelta(minutes=i), question_count=rng.randint(5, 50)
+        )
+        for i in range(1, count + 1)
+    ]
+    users = [
+        User(
+            id=i, username=f"user{i}", email=f"user{i}@example.com", full_name=_text(rng, 3),
+            role=UserRole.CLIENT, is_active=True, created_at=now - timedelta(days=i % 365)
+        )
+        for i in range(1, count + 1)
+    ]
+    return {
+        "videos": (videos, serialization.video_list),
+        "tests": (tests, serialization.test_summary_list),
+        "users": (users, serialization.user_list),
+    }
+
+def _best_of(repeat: int, func) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def main(rows: int, repeat: int) -> None:
+    datasets = build_rows(rows)
+    scale = 1000.0 / rows
+
+    print(f"{'javob':<8} {'fastapi+json':>14} {'fastapi+orjson':>15} {'typeadapter':>12}   (ms / 1000 qator)")
+    for name, (data, adapter) in datasets.items():
+        field = create_model_field(name="Response_" + name, type_=adapter._type, mode="serialization")
+
+        def fastapi_path(response_class):
+            content = asyncio.run(serialize_response(field=field, response_content=data))
+            return response_class(content).body
+
+        sizes = {
+            len(fastapi_path(JSONResponse)), len(fastapi_path(ORJSONResponse)), len(serialization.dump_json(adapter, data))
+        }
+        timings = [
+            _best_of(repeat, lambda: fastapi_path(JSONResponse)),
+            _best_of(repeat, lambda: fastapi_path(ORJSONResponse)),
+            _best_of(repeat, lambda: serialization.dump_json(adapter, data)),
+        ]
+        print(f"{name:<8} " + " ".join(
+            f"{timing * 1000 * scale:>{width}.2f}" for timing, width in zip(timings, (14, 15, 12))
+        ) + f"   (javob hajmi: {'/'.join(str(size) for size in sorted(sizes))} bayt)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    main(args.rows, args.repeat)
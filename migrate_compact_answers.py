@@ -0,0 +1,67 @@
+"""
+Test natijalari javoblarini ixcham formatga o'tkazish scripti
+
+test_results.answers (JSON) dagi javoblarni answers_packed (BYTEA) ga
+o'tkazadi. Jadval id bo'yicha batch larga bo'linadi, har batch alohida
+tranzaksiya - uzoq lock va katta WAL bo'lmaydi, script istalgan vaqtda
+to'xtatib qayta ishga tushirilishi mumkin.
+
+Yangi natijalar ham ixcham saqlanishi uchun COMPACT_TEST_ANSWERS=true qo'ying.
+
+Ishlatish:
+    python migrate_compact_answers.py [--batch-size 5000]
+"""
+
+import argparse
+import time
+from sqlalchemy import text
+from app.answer_codec import pack_answers
+from app.database import SessionLocal
+from app.main import app  # noqa: F401 - modellar va schema upgrade lar
+
+SELECT_BATCH = text("""
+    SELECT id, answers FROM test_results
+    WHERE id > :last_id AND answers_packed IS NULL AND answers IS NOT NULL
+    ORDER BY id
+    LIMIT :batch_size
+""")
+
+UPDATE_ROW = text("UPDATE test_results SET answers_packed = :packed, answers = NULL WHERE id = :id")
+
+def migrate(batch_size: int) -> None:
+    db = SessionLocal()
+    last_id, converted, skipped = 0, 0, 0
+    started = time.perf_counter()
+    try:
+        while True:
+            rows = db.execute(SELECT_BATCH, {"last_id": last_id, "batch_size": batch_size}).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            updates = []
+            for row in rows:
+                packed = pack_answers(row.answers) if isinstance(row.answers, list) else None
+                if packed is None:
+                    skipped += 1  # ixcham formatga sig'maydi - JSON da qoladi
+                else:
+                    updates.append({"id": row.id, "packed": packed})
+            if updates:
+                db.execute(UPDATE_ROW, updates)
+            db.commit()
+
+            converted += len(updates)
+            print(f"   id <= {last_id}: {converted} ta o'tkazildi, {skipped} ta o'tkazib yuborildi")
+
+        print(f"✅ Tayyor: {converted} ta natija ({time.perf_counter() - started:.1f} s)")
+    except Exception as e:
+        print(f"❌ Xatolik yuz berdi: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+    migrate(args.batch_size)
@@ -0,0 +1,52 @@
+"""
+Javoblar kaliti: Integer ustundagi har qanday correct_answer bilan baholash
+
+Postgres kerak (DATABASE_URL); u bo'lmasa testlar o'tkazib yuboriladi.
+"""
+
+import os
+import secrets
+import pytest
+
+if not os.getenv("DATABASE_URL", "").startswith("postgresql"):
+    pytest.skip("DATABASE_URL (Postgres) berilmagan", allow_module_level=True)
+
+from fastapi.testclient import TestClient  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.enums import UserRole  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.utils import create_access_token, hash_password  # noqa: E402
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+@pytest.fixture(scope="module")
+def auth():
+    username = "answer_keys_" + secrets.token_hex(4)
+    db = SessionLocal()
+    db.add(User(username=username, role=UserRole.SUPERADMIN, hashed_password=hash_password(secrets.token_hex(8))))
+    db.commit()
+    db.close()
+    return {"Authorization": "Bearer " + create_access_token({"sub": username})}
+
+def test_out_of_byte_range_correct_answer_is_graded(client, auth):
+    questions = [
+        {"question_text": "q1", "options": ["a", "b"], "correct_answer": 200},
+        {"question_text": "q2", "options": ["a", "b"], "correct_answer": -1000},
+    ]
+    response = client.post(
+        "/tests/", json={"title": "wide", "passing_score": 50, "questions": questions}, headers=auth
+    )
+    assert response.status_code == 200
+    test_id = response.json()["id"]
+
+    attempt = client.post(f"/tests/{test_id}/start", headers=auth)
+    assert attempt.status_code == 200
+
+    result = client.post("/tests/submit", json={"test_id": test_id, "answers": [200, 0]}, headers=auth)
+    assert result.status_code == 200
+    assert result.json()["score"] == 1
+    assert result.json()["percentage"] == 50